@@ -0,0 +1,130 @@
+# Cálculos de las páginas de sueldos sin dependencias de Streamlit.
+# La página "Sueldos FC", la "Tabla Salarial", los reportes y la API local
+# (api.py) usan estas funciones, así que los números son los mismos en todos
+# lados. Reciben los DataFrames del catálogo con los importes en centavos y
+# devuelven pesos.
+import pandas as pd
+
+import ingesta
+import montos
+from busqueda import nombres_completos
+
+# Columnas por las que se puede filtrar y agrupar en Sueldos FC
+COLUMNAS_FILTRO_FC = [
+    'Empresa', 'CCT', 'Grupo', 'Comitente', 'Puesto', 'seniority', 'Gerencia', 'CVH',
+    'Puesto_tabla_salarial', 'Locacion', 'Centro_de_Costos', 'Especialidad', 'Superior'
+]
+CUARTILES = ['Q1', 'Q2', 'Q3', 'Q4', 'Q5']
+# Tramos de la banda salarial, también usados por el simulador
+CATEGORIAS_BANDA = ['< 25%', '25-50%', '50-75%', '≥ 75%']
+
+
+# Copia de Sueldos FC lista para filtrar: categorías como texto sin '#Ref',
+# nombre completo y porcentaje de banda normalizado.
+def preparar_fc(df):
+    df = df.copy()
+    for col in ingesta.COLUMNAS_CATEGORICAS_FC:
+        if col in df.columns:
+            df[col] = df[col].astype(str).replace(['#Ref', 'nan'], '')
+        else:
+            df[col] = ''
+    df['Apellido_y_Nombre'] = nombres_completos(df)
+    if 'Porcentaje_Banda_Salarial' in df.columns:
+        df['Porcentaje_Banda_Salarial'] = ingesta.normalizar_banda(df['Porcentaje_Banda_Salarial'])
+    return df
+
+
+def agrupadores_fc(df):
+    return [col for col in COLUMNAS_FILTRO_FC if col in df.columns]
+
+
+# `filtros` es {columna: [valores]}; una lista vacía no filtra.
+def filtrar(df, filtros):
+    mascara = pd.Series(True, index=df.index)
+    for columna, valores in filtros.items():
+        if valores:
+            mascara &= df[columna].isin(valores)
+    return df[mascara]
+
+
+# Métricas del "Resumen General" con las mismas claves que usan los reportes.
+def resumen_fc(df):
+    metricas = {
+        'total_personas': len(df),
+        'promedio_sueldo': 0, 'minimo_sueldo': 0, 'maximo_sueldo': 0,
+        'dispersion_sueldo': 0, 'dispersion_porcentaje': 0, 'costo_total': 0,
+        'banda_25': 0, 'banda_50': 0, 'banda_75': 0, 'banda_arriba_75': 0,
+    }
+    if len(df) == 0:
+        return metricas
+
+    sueldos = montos.resumen(df['Total_sueldo_bruto'])
+    metricas['promedio_sueldo'] = sueldos['promedio']
+    metricas['minimo_sueldo'] = sueldos['minimo']
+    metricas['maximo_sueldo'] = sueldos['maximo']
+    metricas['dispersion_sueldo'] = sueldos['maximo'] - sueldos['minimo']
+    if sueldos['minimo'] > 0:
+        metricas['dispersion_porcentaje'] = metricas['dispersion_sueldo'] / sueldos['minimo'] * 100
+    if 'Costo_laboral' in df.columns:
+        metricas['costo_total'] = montos.suma(df['Costo_laboral'])
+
+    if 'Porcentaje_Banda_Salarial' in df.columns:
+        banda = df['Porcentaje_Banda_Salarial']
+        metricas['banda_25'] = (banda < 0.25).sum() / len(df) * 100
+        metricas['banda_50'] = (banda < 0.50).sum() / len(df) * 100
+        metricas['banda_75'] = (banda < 0.75).sum() / len(df) * 100
+        metricas['banda_arriba_75'] = (banda >= 0.75).sum() / len(df) * 100
+    return metricas
+
+
+# Porcentaje de personas en cada tramo de la banda salarial.
+def distribucion_bandas(metricas):
+    return pd.DataFrame({
+        'Categoría': CATEGORIAS_BANDA,
+        'Porcentaje': [
+            metricas['banda_25'],
+            metricas['banda_50'] - metricas['banda_25'],
+            metricas['banda_75'] - metricas['banda_50'],
+            metricas['banda_arriba_75'],
+        ]
+    })
+
+
+# Porcentaje de filas por valor de `columna` (Especialidad, seniority).
+def distribucion(df, columna, titulo=None):
+    dist = (df[columna].value_counts(normalize=True) * 100).reset_index()
+    dist.columns = [titulo or columna, 'Porcentaje']
+    return dist
+
+
+# Estadísticas de sueldo bruto por categoría, como en "Comparación por Categoría".
+def estadisticas_por_grupo(df, grupo):
+    grouped_data = montos.por_grupo(df, grupo, 'Total_sueldo_bruto').rename(columns={
+        'Promedio': 'Sueldo_Promedio',
+        'Minimo': 'Sueldo_Mínimo',
+        'Maximo': 'Sueldo_Máximo',
+    })
+    return grouped_data[[grupo, 'Sueldo_Promedio', 'Sueldo_Mínimo', 'Sueldo_Máximo', 'Cantidad']]
+
+
+# Valores Q1-Q5 de la Tabla Salarial para un puesto, seniority y locación, o
+# None si la combinación no existe.
+def valores_tabla(df_tabla, puesto, seniority, locacion):
+    fila = df_tabla[
+        (df_tabla['Puesto'] == puesto) &
+        (df_tabla['Seniority'] == seniority) &
+        (df_tabla['Locacion'] == locacion)
+    ]
+    if fila.empty:
+        return None
+    return fila[CUARTILES].iloc[0]
+
+
+# Diferencia porcentual entre los promedios de Q1-Q5 de dos selecciones, o
+# None si el promedio de la primera es 0.
+def diferencia_tabla(valores_1, valores_2):
+    promedio_1 = valores_1[CUARTILES].mean()
+    promedio_2 = valores_2[CUARTILES].mean()
+    if promedio_1 == 0:
+        return None
+    return (promedio_2 - promedio_1) / promedio_1 * 100
@@ -0,0 +1,289 @@
+# API HTTP local, de sólo lectura, sobre el núcleo de analitica.py.
+# Devuelve en JSON los mismos números que muestran las páginas, para que otras
+# herramientas internas no tengan que leer la interfaz de Streamlit. Cada
+# respuesta lleva un ETag que depende de la versión de las fuentes en el
+# catálogo y de la consulta normalizada; el JSON ya armado se guarda con esa
+# clave, así que repetir una consulta cuesta una búsqueda en el caché y un
+# cliente que manda If-None-Match recibe 304 sin cuerpo. POST /lote resuelve
+# muchas consultas en un solo pedido.
+#
+#   python api.py --puerto 8510
+#
+#   GET  /fuentes
+#   GET  /sueldos_fc/opciones
+#   GET  /sueldos_fc/resumen?Gerencia=...&seniority=...
+#   GET  /sueldos_fc/grupos?agrupador=Puesto_tabla_salarial&Gerencia=...
+#   GET  /tabla_salarial/valores?puesto=...&seniority=...&locacion=...
+#   POST /lote  {"consultas": [{"ruta": "/sueldos_fc/resumen", "parametros": {...}}, ...]}
+import argparse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import analitica
+import ingesta
+from calidad import ArchivoInvalido
+from catalogo import Catalogo
+
+# Respuestas JSON guardadas, de las usadas más recientemente
+MAX_RESPUESTAS = 512
+MAX_CONSULTAS_LOTE = 200
+
+
+class ConsultaInvalida(ValueError):
+    pass
+
+
+class RutaDesconocida(KeyError):
+    pass
+
+
+def _a_json(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(valor).isoformat()
+    raise TypeError(f"{type(valor).__name__} no se puede pasar a JSON")
+
+
+def _registros(df):
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+
+def _serializar(datos):
+    return json.dumps(datos, default=_a_json, ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+
+# Parámetros como {nombre: [valores]} ordenados, para que la misma consulta
+# escrita en otro orden tenga el mismo ETag.
+def _normalizar(parametros):
+    normalizados = {}
+    for nombre, valores in (parametros or {}).items():
+        if not isinstance(valores, (list, tuple)):
+            valores = [valores]
+        valores = sorted({str(v) for v in valores if v is not None and str(v) != ''})
+        if valores:
+            normalizados[str(nombre)] = valores
+    return dict(sorted(normalizados.items()))
+
+
+def _unico(parametros, nombre):
+    valores = parametros.get(nombre, [])
+    if len(valores) != 1:
+        raise ConsultaInvalida(f"se espera exactamente un valor para '{nombre}'")
+    return valores[0]
+
+
+class ServicioAnalitico:
+    def __init__(self, catalogo, max_respuestas=MAX_RESPUESTAS):
+        self.catalogo = catalogo
+        self.max_respuestas = max_respuestas
+        self._lock = threading.Lock()
+        self._respuestas = OrderedDict()   # etag -> JSON en bytes
+        self._preparados = {}              # nombre -> (version, DataFrame preparado)
+        # ruta -> (fuentes de las que depende, función(parametros))
+        self.rutas = {
+            '/fuentes': ([], self._fuentes),
+            '/sueldos_fc/opciones': (['sueldos_fc'], self._opciones_fc),
+            '/sueldos_fc/resumen': (['sueldos_fc'], self._resumen_fc),
+            '/sueldos_fc/grupos': (['sueldos_fc'], self._grupos_fc),
+            '/tabla_salarial/valores': (['tabla_salarial'], self._valores_tabla),
+        }
+
+    # Devuelve (etag, cuerpo). El ETag se calcula sólo con las versiones del
+    # catálogo, sin tocar los datos, y si ya hay una respuesta con esa clave se
+    # devuelve tal cual.
+    def consultar(self, ruta, parametros=None):
+        if ruta not in self.rutas:
+            raise RutaDesconocida(ruta)
+        fuentes, calcular = self.rutas[ruta]
+        parametros = _normalizar(parametros)
+        versiones = {nombre: self.catalogo.version(nombre) for nombre in fuentes}
+        if not fuentes:
+            versiones = self._versiones()
+        firma = json.dumps([ruta, versiones, parametros], sort_keys=True, ensure_ascii=False)
+        etag = '"' + hashlib.sha1(firma.encode('utf-8')).hexdigest() + '"'
+
+        with self._lock:
+            cuerpo = self._respuestas.get(etag)
+            if cuerpo is not None:
+                self._respuestas.move_to_end(etag)
+                return etag, cuerpo
+
+        cuerpo = _serializar({'ruta': ruta, 'parametros': parametros, 'versiones': versiones, 'datos': calcular(parametros)})
+        with self._lock:
+            self._respuestas[etag] = cuerpo
+            while len(self._respuestas) > self.max_respuestas:
+                self._respuestas.popitem(last=False)
+        return etag, cuerpo
+
+    # Resuelve cada consulta del lote por separado: un error en una no corta
+    # las demás. El ETag del lote combina los de cada consulta.
+    def lote(self, consultas):
+        if not isinstance(consultas, list):
+            raise ConsultaInvalida("'consultas' debe ser una lista")
+        if len(consultas) > MAX_CONSULTAS_LOTE:
+            raise ConsultaInvalida(f"el lote admite hasta {MAX_CONSULTAS_LOTE} consultas")
+        partes = []
+        etags = []
+        for consulta in consultas:
+            ruta = consulta.get('ruta') if isinstance(consulta, dict) else None
+            try:
+                if not isinstance(consulta, dict):
+                    raise ConsultaInvalida("cada consulta debe ser un objeto con 'ruta' y 'parametros'")
+                if not isinstance(ruta, str):
+                    raise ConsultaInvalida("'ruta' debe ser un texto")
+                if not isinstance(consulta.get('parametros'), (dict, type(None))):
+                    raise ConsultaInvalida("'parametros' debe ser un objeto")
+                etag, cuerpo = self.consultar(ruta, consulta.get('parametros'))
+            except Exception as e:
+                estado, mensaje = _estado_error(e)
+                etags.append(f"{estado}:{mensaje}")
+                partes.append(_serializar({'ruta': ruta if isinstance(ruta, str) else None, 'estado': estado, 'error': mensaje}))
+                continue
+            etags.append(etag)
+            partes.append(cuerpo)
+        etag = '"' + hashlib.sha1('|'.join(etags).encode('utf-8')).hexdigest() + '"'
+        return etag, b'{"resultados": [' + b', '.join(partes) + b']}'
+
+    def _versiones(self):
+        versiones = {}
+        for nombre in ingesta.ESQUEMAS:
+            try:
+                versiones[nombre] = self.catalogo.version(nombre)
+            except (FileNotFoundError, ArchivoInvalido):
+                versiones[nombre] = None
+        return versiones
+
+    # Sueldos FC preparado para filtrar, una vez por versión.
+    def _sueldos_fc(self):
+        version, df = self.catalogo.obtener('sueldos_fc')
+        actual = self._preparados.get('sueldos_fc')
+        if actual is None or actual[0] != version:
+            actual = (version, analitica.preparar_fc(df))
+            self._preparados['sueldos_fc'] = actual
+        return actual[1]
+
+    def _filtrado_fc(self, parametros, propios=()):
+        df = self._sueldos_fc()
+        filtros = {nombre: valores for nombre, valores in parametros.items() if nombre not in propios}
+        desconocidos = [nombre for nombre in filtros if nombre not in analitica.agrupadores_fc(df)]
+        if desconocidos:
+            raise ConsultaInvalida(f"filtros desconocidos: {', '.join(desconocidos)}")
+        return analitica.filtrar(df, filtros)
+
+    def _fuentes(self, parametros):
+        return self._versiones()
+
+    def _opciones_fc(self, parametros):
+        df = self._sueldos_fc()
+        return {col: sorted(v for v in df[col].unique() if v) for col in analitica.agrupadores_fc(df)}
+
+    def _resumen_fc(self, parametros):
+        df_filtered = self._filtrado_fc(parametros)
+        metricas = analitica.resumen_fc(df_filtered)
+        return {'metricas': metricas, 'bandas': _registros(analitica.distribucion_bandas(metricas))}
+
+    def _grupos_fc(self, parametros):
+        df = self._sueldos_fc()
+        agrupador = _unico(parametros, 'agrupador')
+        if agrupador not in analitica.agrupadores_fc(df):
+            raise ConsultaInvalida(f"agrupador desconocido: {agrupador}")
+        df_filtered = self._filtrado_fc(parametros, propios=('agrupador',))
+        return _registros(analitica.estadisticas_por_grupo(df_filtered, agrupador))
+
+    def _valores_tabla(self, parametros):
+        _, df_tabla = self.catalogo.obtener('tabla_salarial')
+        valores = analitica.valores_tabla(
+            df_tabla, _unico(parametros, 'puesto'), _unico(parametros, 'seniority'), _unico(parametros, 'locacion')
+        )
+        return None if valores is None else {q: (None if pd.isna(v) else v) for q, v in valores.items()}
+
+
+def _estado_error(error):
+    if isinstance(error, RutaDesconocida):
+        return 404, f"ruta desconocida: {error.args[0]}"
+    if isinstance(error, ConsultaInvalida):
+        return 400, str(error)
+    if isinstance(error, FileNotFoundError):
+        return 503, f"fuente no disponible: {error.filename or error}"
+    if isinstance(error, ArchivoInvalido):
+        return 503, str(error)
+    return 500, f"error interno: {type(error).__name__}"
+
+
+class ManejadorAPI(BaseHTTPRequestHandler):
+    servicio = None
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        self._responder(lambda: self.servicio.consultar(partes.path.rstrip('/') or '/', parse_qs(partes.query)))
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip('/') != '/lote':
+            self._enviar(404, _serializar({'error': f"ruta desconocida: {self.path}"}))
+            return
+        try:
+            largo = int(self.headers.get('Content-Length', 0))
+            pedido = json.loads(self.rfile.read(largo) or b'{}')
+        except ValueError:
+            self._enviar(400, _serializar({'error': 'el cuerpo no es JSON válido'}))
+            return
+        consultas = pedido.get('consultas') if isinstance(pedido, dict) else None
+        self._responder(lambda: self.servicio.lote(consultas))
+
+    def _responder(self, resolver):
+        try:
+            etag, cuerpo = resolver()
+        except (RutaDesconocida, ConsultaInvalida, FileNotFoundError, ArchivoInvalido) as e:
+            estado, mensaje = _estado_error(e)
+            self._enviar(estado, _serializar({'error': mensaje}))
+            return
+        except Exception as e:
+            # Un error inesperado no debe cortar la conexión sin respuesta
+            self.log_error("error al resolver %s: %r", self.path, e)
+            estado, mensaje = _estado_error(e)
+            self._enviar(estado, _serializar({'error': mensaje}))
+            return
+        if etag in [v.strip() for v in self.headers.get('If-None-Match', '').split(',')]:
+            self._enviar(304, None, etag)
+            return
+        self._enviar(200, cuerpo, etag)
+
+    def _enviar(self, estado, cuerpo, etag=None):
+        self.send_response(estado)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if cuerpo is not None:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        if cuerpo is not None:
+            self.wfile.write(cuerpo)
+
+
+def servir(host='127.0.0.1', puerto=8510, directorio='.'):
+    catalogo = Catalogo(directorio).iniciar()
+    manejador = type('Manejador', (ManejadorAPI,), {'servicio': ServicioAnalitico(catalogo)})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    try:
+        servidor.serve_forever()
+    finally:
+        catalogo.detener()
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="API local de análisis salarial")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8510)
+    parser.add_argument('--directorio', default='.')
+    args = parser.parse_args()
+    servir(args.host, args.puerto, args.directorio)
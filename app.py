@@ -2,12 +2,24 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
-import io
-from PIL import Image
-from fpdf import FPDF
-import tempfile
 import os
+from PIL import Image
 from streamlit.components.v1 import iframe
+import ingesta
+import montos
+import analitica
+from analitica import CATEGORIAS_BANDA
+from catalogo import Catalogo
+from calidad import ArchivoInvalido
+from filtros import perfilar
+from busqueda import IndiceNombres, nombres_completos
+from escenarios import Simulador, CRITERIOS
+import dispersion
+from conciliacion import conciliar
+from tareas import ColaTareas, clave_tarea, PENDIENTE, EN_CURSO, TERMINADA, ERROR
+from reportes import excel_sueldos_fc, pdf_sueldos_fc, paquete_consolidado, escribir_libro
+from historico import Historico, FUENTES as FUENTES_HISTORICO, comparar_periodos
+import kpi
 
 # Configuración de la página
 st.set_page_config(
@@ -104,6 +116,56 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# Catálogo de datos compartido por todas las sesiones; se refresca solo cuando
+# cambian los libros en el directorio
+@st.cache_resource
+def get_historico():
+    return Historico()
+
+@st.cache_resource
+def get_catalogo():
+    catalogo = Catalogo()
+    historico = get_historico()
+
+    # Cada libro de sueldos nuevo que trae su período se archiva una sola vez
+    # en el histórico; los demás se agregan a mano desde Evolución Histórica
+    def archivar(nombre, version):
+        try:
+            historico.registrar_archivo(nombre, catalogo.ruta(nombre), df=catalogo.obtener(nombre)[1])
+        except (ArchivoInvalido, ValueError):
+            # Libro rechazado o sin período: no es una falla del histórico
+            return
+        except Exception as e:
+            # Falta el motor de parquet, el directorio no se puede escribir, etc.
+            historico.errores[nombre] = f"{type(e).__name__}: {e}"
+            return
+        historico.errores.pop(nombre, None)
+
+    for nombre in FUENTES_HISTORICO:
+        catalogo.suscribir(nombre, archivar)
+    return catalogo.iniciar()
+
+# Cola de tareas en segundo plano compartida por todas las sesiones
+@st.cache_resource
+def get_cola_tareas():
+    return ColaTareas()
+
+# Índice de búsqueda de nombres, armado una vez por página y versión del libro
+@st.cache_resource(max_entries=8)
+def indice_nombres(clave, version, _nombres):
+    return IndiceNombres(_nombres)
+
+# PDFs estáticos del repositorio: se leen recién cuando alguien los pide y
+# quedan en memoria hasta que cambia el archivo
+@st.cache_resource(max_entries=4)
+def leer_pdf(ruta, firma):
+    with open(ruta, "rb") as f:
+        return f.read()
+
+def firma_archivo(ruta):
+    info = os.stat(ruta)
+    return f"{info.st_mtime_ns:x}-{info.st_size:x}"
+
 # Inicializar el estado de la sesión
 if 'authenticated' not in st.session_state:
     st.session_state.authenticated = False
@@ -147,15 +209,82 @@ else:
     def mostrar_titulo_principal():
         st.markdown("<h1 style='text-align: center;'>Dirección de Desarrollo de las Personas</h1>", unsafe_allow_html=True)
 
+    # Trae una fuente del catálogo con su reporte de calidad, calculado una sola
+    # vez al ingerir el libro. Si el libro falta o no pasó la validación se
+    # informa y se detiene la página.
+    def obtener_fuente(nombre):
+        catalogo = get_catalogo()
+        archivo = ingesta.ESQUEMAS[nombre]['archivo']
+        try:
+            resultado = catalogo.obtener(nombre)
+        except FileNotFoundError:
+            st.error(f"No se encontró el archivo {archivo}. Asegúrate de que esté en el directorio raíz del repositorio.")
+            st.stop()
+        except ArchivoInvalido as e:
+            st.error(f"El archivo {archivo} no pasó la validación: {'; '.join(e.reporte['errores'])}")
+            st.stop()
+        rechazo = catalogo.rechazo(nombre)
+        if rechazo is not None:
+            st.warning(f"Se rechazó la nueva versión de {archivo} ({'; '.join(rechazo.reporte['errores'])}); se siguen mostrando los datos anteriores.")
+        reporte = catalogo.calidad(nombre)
+        if reporte['advertencias']:
+            with st.expander(f"Calidad de datos de {archivo}: {len(reporte['advertencias'])} advertencias"):
+                for advertencia in reporte['advertencias']:
+                    st.write(f"- {advertencia}")
+                st.dataframe(reporte['columnas'], hide_index=True)
+                if not reporte['montos'].empty:
+                    st.dataframe(reporte['montos'], hide_index=True)
+        return resultado
+
+    # Vuelve a ejecutar la página cuando el catálogo publica otra versión de la fuente
+    @st.fragment(run_every=10)
+    def vigilar_version(nombre, version):
+        if get_catalogo().version(nombre) != version:
+            st.rerun()
+
+    # Avance de una tarea en curso. Sólo este fragmento se refresca mientras la
+    # tarea está pendiente; al terminar vuelve a correr la página una vez para
+    # mostrar el resultado fuera del refresco periódico.
+    @st.fragment(run_every=2)
+    def avance_tarea(clave):
+        tarea = get_cola_tareas().tarea(clave)
+        if tarea is None or tarea.estado not in (PENDIENTE, EN_CURSO):
+            st.rerun()
+        st.progress(tarea.progreso, text=tarea.mensaje or "En cola...")
+
+    # Muestra el avance de una tarea y, cuando termina, el botón de descarga
+    def mostrar_tarea(clave, etiqueta, file_name, mime):
+        cola = get_cola_tareas()
+        estado = cola.estado(clave)
+        if estado == TERMINADA:
+            contenido = cola.resultado(clave)
+            if contenido is not None:
+                st.download_button(label=etiqueta, data=contenido, file_name=file_name, mime=mime, key=f"descargar_{clave}")
+        elif estado == ERROR:
+            st.error(f"Error al generar el archivo: {cola.tarea(clave).error}")
+        elif estado is not None:
+            avance_tarea(clave)
+
+    # Exportación a Excel en la cola de tareas: `hojas` es [(nombre, df)] y la
+    # clave debe incluir la versión de los datos y los filtros aplicados
+    def exportar_excel(clave, hojas, boton, etiqueta, file_name, descripcion):
+        if st.button(boton):
+            get_cola_tareas().enviar(clave, escribir_libro, hojas, descripcion=descripcion)
+        mostrar_tarea(clave, etiqueta, file_name, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
     # Menú principal
     st.title("DDP 2025")
     page = st.selectbox("Selecciona una página", [
         "Novedades DDP",
         "Indicadores",
+        "KPI Formación",
         "Análisis de Legajos",
         "Sueldos FC",
+        "Simulador de Aumentos",
         "Sueldos Todos",
+        "Conciliación",
         "Comparar Personas",
+        "Evolución Histórica",
         "Tabla Salarial"
     ])
 
@@ -197,50 +326,158 @@ else:
         except FileNotFoundError:
             st.error("No se encontró el archivo Indicadores DDP.pdf. Asegúrate de que esté en el directorio raíz del repositorio.")
 
-    # --- Página: Análisis de Legajos ---
-    elif page == "Análisis de Legajos":
+    # --- Página: KPI Formación ---
+    elif page == "KPI Formación":
         mostrar_titulo_principal()
-        st.title("Análisis de Legajos")
+        st.title("KPI Formación")
+
+        # Los rollups se calculan una vez por versión de kpi.xlsx
+        @st.cache_resource(max_entries=2)
+        def preparar_kpi(version):
+            return kpi.rollups(get_catalogo().obtener('kpi')[1])
 
-        @st.cache_data
-        def load_analisis_legajos():
-            return pd.read_excel("Análisis de legajos.xlsx", sheet_name=0)
+        version = obtener_fuente('kpi')[0]
+        rollups = preparar_kpi(version)
+        vigilar_version('kpi', version)
+
+        if not rollups['indicadores']:
+            st.warning("El archivo kpi.xlsx no tiene indicadores cargados.")
+            st.stop()
 
+        def formatear(indicador, valor):
+            if pd.isna(valor):
+                return "-"
+            if indicador in rollups['tasas']:
+                return f"{valor * 100:.1f}%"
+            return f"{valor:,.0f}" if float(valor).is_integer() else f"{valor:,.2f}"
+
+        st.markdown("### Último período cargado")
+        ultimo = rollups['ultimo']
+        tabla_ultimo = pd.DataFrame({
+            'Indicador': ultimo.index,
+            'Período': ultimo['Periodo'].to_numpy(),
+            'Valor': [formatear(i, v) for i, v in zip(ultimo.index, ultimo['Total'])],
+            'Período anterior': [formatear(i, v) for i, v in zip(ultimo.index, ultimo['Anterior'])],
+        })
+        st.dataframe(tabla_ultimo, hide_index=True)
+
+        indicador = st.selectbox("Indicador", rollups['indicadores'])
+        fila = ultimo.loc[indicador]
+        serie_total = rollups['por_periodo'][rollups['por_periodo']['indicador'] == indicador]
+        es_tasa = indicador in rollups['tasas']
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            delta = None if pd.isna(fila['Variacion']) else (
+                f"{fila['Variacion'] * 100:+.1f} pp" if es_tasa else f"{fila['Variacion']:+,.2f}")
+            st.metric(f"Total {fila['Periodo']}", formatear(indicador, fila['Total']), delta)
+        with col2:
+            st.metric("Promedio de los períodos", formatear(indicador, serie_total['Total'].mean()))
+        with col3:
+            st.metric("Mínimo / Máximo", f"{formatear(indicador, serie_total['Total'].min())} / {formatear(indicador, serie_total['Total'].max())}")
+
+        formato_eje = '.1%' if es_tasa else ',.2f'
+        st.markdown(f"### {indicador} por período")
+        st.caption(f"Total: fila {kpi.AREA_TOTAL} cuando el bloque la trae; si no, promedio de las áreas.")
+        total_chart = alt.Chart(serie_total).mark_line(point=True).encode(
+            x=alt.X('Periodo:O', title='Período'),
+            y=alt.Y('Total:Q', title=indicador, axis=alt.Axis(format=formato_eje)),
+            tooltip=['Periodo', alt.Tooltip('Total:Q', format=formato_eje)]
+        ).properties(height=300)
+        st.altair_chart(total_chart, use_container_width=True)
+
+        serie_areas = rollups['series'][indicador]
+        if not serie_areas.empty:
+            st.markdown(f"### {indicador} por área")
+            areas_chart = alt.Chart(serie_areas).mark_line(point=True).encode(
+                x=alt.X('Periodo:O', title='Período'),
+                y=alt.Y('valor:Q', title=indicador, axis=alt.Axis(format=formato_eje)),
+                color=alt.Color('area:N', title='Área'),
+                tooltip=['area', 'Periodo', alt.Tooltip('valor:Q', format=formato_eje)]
+            ).properties(height=400)
+            st.altair_chart(areas_chart, use_container_width=True)
+
+            por_area = rollups['por_area'][rollups['por_area']['indicador'] == indicador].drop(columns='indicador')
+            st.dataframe(por_area, hide_index=True)
+
+        with st.expander("Tabla por área y período"):
+            st.dataframe(rollups['tablas'][indicador])
+
+        st.markdown("### Descargar KPI Formación")
         try:
-            df_legajos = load_analisis_legajos()
+            firma_pdf = firma_archivo("KPI formacion.pdf")
         except FileNotFoundError:
-            st.error("No se encontró el archivo Análisis de legajos.xlsx")
-            st.stop()
+            st.error("No se encontró el archivo KPI formacion.pdf. Asegúrate de que esté en el directorio raíz del repositorio.")
+        else:
+            # El PDF se lee sólo cuando se pide y después se sirve desde memoria
+            if st.session_state.get('kpi_pdf') != firma_pdf:
+                if st.button("Preparar KPI formacion.pdf"):
+                    st.session_state['kpi_pdf'] = firma_pdf
+                    st.rerun()
+            else:
+                st.download_button(
+                    label="Descargar KPI formacion.pdf",
+                    data=leer_pdf("KPI formacion.pdf", firma_pdf),
+                    file_name="KPI formacion.pdf",
+                    mime="application/pdf"
+                )
 
-        df_legajos.columns = df_legajos.columns.str.strip().str.replace(' ', '_')
-        categorical_columns = [col for col in df_legajos.columns if df_legajos[col].dtype == 'object']
-        for col in categorical_columns:
-            df_legajos[col] = df_legajos[col].astype(str).replace(['#Ref', 'nan'], '')
+    # --- Página: Análisis de Legajos ---
+    elif page == "Análisis de Legajos":
+        mostrar_titulo_principal()
+        st.title("Análisis de Legajos")
 
-        date_columns = [col for col in df_legajos.columns if 'fecha' in col.lower() or 'date' in col.lower()]
-        for col in date_columns:
-            df_legajos[col] = pd.to_datetime(df_legajos[col], errors='coerce')
+        # Limpieza, perfil de columnas e índices se calculan una vez por versión del libro
+        @st.cache_resource(max_entries=2)
+        def preparar_legajos(version):
+            df_legajos = get_catalogo().obtener('legajos')[1].copy()
+            categorical_columns = [col for col in df_legajos.columns if df_legajos[col].dtype == 'object']
+            for col in categorical_columns:
+                df_legajos[col] = df_legajos[col].astype(str).replace(['#Ref', 'nan'], '')
+            return df_legajos, perfilar(df_legajos)
 
-        # Filtros en el sidebar
+        version = obtener_fuente('legajos')[0]
+        df_legajos, perfil = preparar_legajos(version)
+        vigilar_version('legajos', version)
+
+        # Filtros en el sidebar: multiselect para pocas opciones, buscador para
+        # columnas con muchos valores y rango para fechas
+        mascara = np.ones(len(df_legajos), dtype=bool)
+        criterios = {}
         with st.sidebar:
             st.header("Filtros")
-            filtros = {}
-            for col in categorical_columns:
-                if col in df_legajos.columns:
-                    label = col.replace('_', ' ').title()
-                    unique_values = [x for x in df_legajos[col].unique() if x]
-                    filtros[col] = st.multiselect(label, unique_values, key=f"filter_{col}_legajos")
+            for col, info in perfil.items():
+                label = col.replace('_', ' ').title()
+                if info['tipo'] == 'opciones':
+                    seleccion = st.multiselect(label, info['valores'], key=f"filter_{col}_legajos")
+                    if seleccion:
+                        criterios[col] = seleccion
+                        mascara &= df_legajos[col].isin(seleccion).to_numpy()
+                elif info['tipo'] == 'busqueda':
+                    texto = st.text_input(f"Buscar {label}", key=f"filter_{col}_legajos")
+                    if texto.strip():
+                        criterios[col] = texto.strip()
+                        coincidencias = info['indice'].buscar(texto)
+                        st.caption(f"{len(coincidencias)} de {len(info['indice'])} valores coinciden")
+                        mascara &= df_legajos[col].isin(coincidencias).to_numpy()
                 else:
-                    filtros[col] = []
+                    indice = info['indice']
+                    if len(indice) == 0 or indice.minimo() == indice.maximo():
+                        continue
+                    rango_completo = (indice.minimo(), indice.maximo())
+                    rango = st.slider(label, min_value=rango_completo[0], max_value=rango_completo[1],
+                                      value=rango_completo, format="DD/MM/YYYY", key=f"filter_{col}_legajos")
+                    if tuple(rango) != rango_completo:
+                        criterios[col] = rango
+                        en_rango = np.zeros(len(df_legajos), dtype=bool)
+                        en_rango[indice.filas_entre(*rango)] = True
+                        mascara &= en_rango
 
         # Contenido principal
         with st.container():
             st.markdown('<div class="main-content">', unsafe_allow_html=True)
-            
-            df_filtered = df_legajos.copy()
-            for key, values in filtros.items():
-                if values:
-                    df_filtered = df_filtered[df_filtered[key].isin(values)]
+
+            df_filtered = df_legajos[mascara]
 
             st.subheader("Resumen General - Análisis de Legajos")
             if len(df_filtered) > 0:
@@ -259,16 +496,9 @@ else:
                 mime='text/csv',
             )
 
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df_filtered.to_excel(writer, index=False, sheet_name='Datos Filtrados')
-            excel_data = output.getvalue()
-            st.download_button(
-                label="Descargar datos filtrados como Excel",
-                data=excel_data,
-                file_name='analisis_legajos_filtrados.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            )
+            exportar_excel(clave_tarea('excel_legajos', version, criterios), [('Datos Filtrados', df_filtered)],
+                           "Preparar datos filtrados en Excel", "Descargar datos filtrados como Excel",
+                           'analisis_legajos_filtrados.xlsx', "Legajos filtrados en Excel")
 
             st.markdown('</div>', unsafe_allow_html=True)
 
@@ -277,108 +507,66 @@ else:
         mostrar_titulo_principal()
         st.title("Análisis Salarial Personal Fuera de Convenio")
 
-        @st.cache_data
-        def load_data():
-            return pd.read_excel("SUELDOS PARA INFORMES.xlsx", sheet_name=0)
+        version, df = obtener_fuente('sueldos_fc')
+        df = analitica.preparar_fc(df)
+        vigilar_version('sueldos_fc', version)
 
-        try:
-            df = load_data()
-        except FileNotFoundError:
-            st.error("No se encontró el archivo SUELDOS PARA INFORMES.xlsx")
-            st.stop()
-
-        df.columns = df.columns.str.strip().str.replace(' ', '_').str.replace('%_BANDA_SALARIAL', 'Porcentaje_Banda_Salarial')
-        categorical_columns = [
-            'Empresa', 'CCT', 'Grupo', 'Comitente', 'Puesto', 'seniority', 'Gerencia', 'CVH',
-            'Puesto_tabla_salarial', 'Locacion', 'Centro_de_Costos', 'Especialidad', 'Superior',
-            'Personaapellido', 'Personanombre'
-        ]
-        for col in categorical_columns:
-            if col in df.columns:
-                df[col] = df[col].astype(str).replace(['#Ref', 'nan'], '')
-            else:
-                df[col] = ''
-
-        date_columns = ['Fecha_de_Ingreso', 'Fecha_de_nacimiento']
-        for col in date_columns:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-
-        if 'Porcentaje_Banda_Salarial' in df.columns:
-            df['Porcentaje_Banda_Salarial'] = pd.to_numeric(df['Porcentaje_Banda_Salarial'], errors='coerce')
-            df['Porcentaje_Banda_Salarial'] = df['Porcentaje_Banda_Salarial'].apply(lambda x: x / 100 if x > 1 else x)
+        # Dispersión por grupo sobre toda la población, una vez por versión y par de agrupadores
+        @st.cache_data(max_entries=16)
+        def analizar_dispersion(version, grupos):
+            return dispersion.analizar(get_catalogo().obtener('sueldos_fc')[1], grupos)
 
         # Filtros en el sidebar
         with st.sidebar:
             st.header("Filtros")
             filtros = {}
-            filter_columns = [
-                'Empresa', 'CCT', 'Grupo', 'Comitente', 'Puesto', 'seniority', 'Gerencia', 'CVH',
-                'Puesto_tabla_salarial', 'Locacion', 'Centro_de_Costos', 'Especialidad', 'Superior',
-                'Personaapellido', 'Personanombre'
-            ]
-            for col in filter_columns:
+            for col in analitica.COLUMNAS_FILTRO_FC:
                 if col in df.columns:
-                    label = "Apellido" if col == "Personaapellido" else "Nombre" if col == "Personanombre" else col.replace('_', ' ').title()
+                    label = col.replace('_', ' ').title()
                     unique_values = [x for x in df[col].dropna().unique() if x]
                     filtros[col] = st.multiselect(label, unique_values, key=f"filter_{col}_sueldos_fc")
                 else:
                     filtros[col] = []
 
+            # Las personas se buscan en el servidor y sólo se ofrecen las coincidencias
+            indice = indice_nombres('sueldos_fc', version, df['Apellido_y_Nombre'])
+            consulta = st.text_input("Buscar Apellido y Nombre", key="buscar_persona_sueldos_fc")
+            # La selección vive en la clave del widget. Las opciones cambian con
+            # cada búsqueda y con ellas el id del widget, así que se vuelve a
+            # asignar la clave para que la selección pase al widget nuevo.
+            seleccionadas = st.session_state.get('personas_sueldos_fc', [])
+            opciones = seleccionadas + [x for x in indice.buscar(consulta) if x not in seleccionadas]
+            st.session_state['personas_sueldos_fc'] = seleccionadas
+            filtros['Apellido_y_Nombre'] = st.multiselect("Personas", opciones, key='personas_sueldos_fc')
+
         # Contenido principal
         with st.container():
             st.markdown('<div class="main-content">', unsafe_allow_html=True)
             
-            df_filtered = df.copy()
-            for key, values in filtros.items():
-                if values:
-                    df_filtered = df_filtered[df_filtered[key].isin(values)]
+            df_filtered = analitica.filtrar(df, filtros)
 
             st.subheader("Resumen General - Sueldos para Informes")
+            # Las mismas métricas que devuelve la API local y que llevan los reportes
+            metricas = analitica.resumen_fc(df_filtered)
             if len(df_filtered) > 0:
-                promedio_sueldo = df_filtered['Total_sueldo_bruto'].mean() if 'Total_sueldo_bruto' in df_filtered.columns else 0
-                minimo_sueldo = df_filtered['Total_sueldo_bruto'].min() if 'Total_sueldo_bruto' in df_filtered.columns else 0
-                maximo_sueldo = df_filtered['Total_sueldo_bruto'].max() if 'Total_sueldo_bruto' in df_filtered.columns else 0
-                dispersion_sueldo = maximo_sueldo - minimo_sueldo
-                dispersion_porcentaje = (dispersion_sueldo / minimo_sueldo * 100) if minimo_sueldo > 0 else 0
-                costo_total = df_filtered['Costo_laboral'].sum() if 'Costo_laboral' in df_filtered.columns else 0
-
                 if 'Especialidad' in df_filtered.columns:
-                    especialidad_dist = df_filtered['Especialidad'].value_counts(normalize=True) * 100
-                    especialidad_dist = especialidad_dist.reset_index()
-                    especialidad_dist.columns = ['Especialidad', 'Porcentaje']
+                    especialidad_dist = analitica.distribucion(df_filtered, 'Especialidad')
                 else:
                     especialidad_dist = pd.DataFrame()
 
-                if 'Porcentaje_Banda_Salarial' in df_filtered.columns:
-                    banda_25 = len(df_filtered[df_filtered['Porcentaje_Banda_Salarial'] < 0.25]) / len(df_filtered) * 100
-                    banda_50 = len(df_filtered[df_filtered['Porcentaje_Banda_Salarial'] < 0.50]) / len(df_filtered) * 100
-                    banda_75 = len(df_filtered[df_filtered['Porcentaje_Banda_Salarial'] < 0.75]) / len(df_filtered) * 100
-                    banda_arriba_75 = len(df_filtered[df_filtered['Porcentaje_Banda_Salarial'] >= 0.75]) / len(df_filtered) * 100
-                else:
-                    banda_25 = banda_50 = banda_75 = banda_arriba_75 = 0
-
                 col1, col2, col3, col4 = st.columns(4)
                 col1.metric("Total Personas", len(df_filtered))
-                col2.metric("Sueldo Bruto Promedio", f"${promedio_sueldo:,.0f}")
-                col3.metric("Sueldo Mínimo", f"${minimo_sueldo:,.0f}")
-                col4.metric("Sueldo Máximo", f"${maximo_sueldo:,.0f}")
+                col2.metric("Sueldo Bruto Promedio", f"${metricas['promedio_sueldo']:,.0f}")
+                col3.metric("Sueldo Mínimo", f"${metricas['minimo_sueldo']:,.0f}")
+                col4.metric("Sueldo Máximo", f"${metricas['maximo_sueldo']:,.0f}")
 
                 col5, col6 = st.columns(2)
-                col5.metric("Dispersión Salarial", f"${dispersion_sueldo:,.0f} ({dispersion_porcentaje:.1f}%)")
-                col6.metric("Costo Laboral Total", f"${costo_total:,.0f}")
+                col5.metric("Dispersión Salarial", f"${metricas['dispersion_sueldo']:,.0f} ({metricas['dispersion_porcentaje']:.1f}%)")
+                col6.metric("Costo Laboral Total", f"${metricas['costo_total']:,.0f}")
 
                 if 'Porcentaje_Banda_Salarial' in df_filtered.columns:
                     st.markdown("### Distribución de Bandas Salariales")
-                    banda_data = pd.DataFrame({
-                        'Categoría': ['< 25%', '25-50%', '50-75%', '≥ 75%'],
-                        'Porcentaje': [
-                            banda_25,
-                            banda_50 - banda_25,
-                            banda_75 - banda_50,
-                            banda_arriba_75
-                        ]
-                    })
+                    banda_data = analitica.distribucion_bandas(metricas)
                     banda_chart = alt.Chart(banda_data).mark_arc().encode(
                         theta=alt.Theta('Porcentaje:Q', stack=True),
                         color=alt.Color('Categoría:N', legend=alt.Legend(title="Banda Salarial")),
@@ -387,33 +575,24 @@ else:
                     st.altair_chart(banda_chart, use_container_width=True)
 
                     st.markdown("**Porcentajes por Banda Salarial**:")
-                    st.write(f"- Debajo del 25%: {banda_25:.1f}%")
-                    st.write(f"- Debajo del 50%: {banda_50:.1f}%")
-                    st.write(f"- Debajo del 75%: {banda_75:.1f}%")
-                    st.write(f"- Arriba del 75%: {banda_arriba_75:.1f}%")
+                    st.write(f"- Debajo del 25%: {metricas['banda_25']:.1f}%")
+                    st.write(f"- Debajo del 50%: {metricas['banda_50']:.1f}%")
+                    st.write(f"- Debajo del 75%: {metricas['banda_75']:.1f}%")
+                    st.write(f"- Arriba del 75%: {metricas['banda_arriba_75']:.1f}%")
 
             else:
                 st.info("No hay datos disponibles con los filtros actuales.")
-                promedio_sueldo = minimo_sueldo = maximo_sueldo = dispersion_sueldo = dispersion_porcentaje = costo_total = 0
-                banda_25 = banda_50 = banda_75 = banda_arriba_75 = 0
                 especialidad_dist = pd.DataFrame()
 
             st.markdown("### Comparación por Categoría")
-            agrupadores = [
-                'Empresa', 'CCT', 'Grupo', 'Comitente', 'Puesto', 'seniority', 'Gerencia', 'CVH',
-                'Puesto_tabla_salarial', 'Locacion', 'Centro_de_Costos', 'Especialidad', 'Superior'
-            ]
-            agrupadores = [col for col in agrupadores if col in df.columns]
+            agrupadores = analitica.agrupadores_fc(df)
             grupo_seleccionado = st.selectbox("Selecciona una categoría para agrupar", agrupadores, index=agrupadores.index('Puesto_tabla_salarial') if 'Puesto_tabla_salarial' in agrupadores else 0)
+            dispersion_grupos = pd.DataFrame()
+            dispersion_atipicos = pd.DataFrame()
 
             if len(df_filtered) > 0:
                 if 'Total_sueldo_bruto' in df_filtered.columns:
-                    grouped_data = df_filtered.groupby(grupo_seleccionado).agg({
-                        'Total_sueldo_bruto': ['mean', 'min', 'max'],
-                        'seniority': 'count'
-                    }).reset_index()
-                    grouped_data.columns = [grupo_seleccionado, 'Sueldo_Promedio', 'Sueldo_Mínimo', 'Sueldo_Máximo', 'Cantidad']
-                    grouped_data = grouped_data.dropna(subset=[grupo_seleccionado, 'Sueldo_Promedio'])
+                    grouped_data = analitica.estadisticas_por_grupo(df_filtered, grupo_seleccionado)
                     grouped_data[grupo_seleccionado] = grouped_data[grupo_seleccionado].astype(str)
 
                     chart = alt.Chart(grouped_data).mark_bar().encode(
@@ -445,9 +624,7 @@ else:
                         ]
 
                     if len(df_puesto) > 0:
-                        seniority_dist = df_puesto['seniority'].value_counts(normalize=True) * 100
-                        seniority_dist = seniority_dist.reset_index()
-                        seniority_dist.columns = ['Seniority', 'Porcentaje']
+                        seniority_dist = analitica.distribucion(df_puesto, 'seniority', 'Seniority')
 
                         seniority_chart = alt.Chart(seniority_dist).mark_arc().encode(
                             theta=alt.Theta('Porcentaje:Q', stack=True),
@@ -461,11 +638,11 @@ else:
                             st.write(f"- {row['Seniority']}: {row['Porcentaje']:.1f}%")
 
                         if puesto_seleccionado != 'Todos los puestos' and 'Total_sueldo_bruto' in df_puesto.columns:
-                            sueldo_stats = df_puesto['Total_sueldo_bruto'].agg(['min', 'mean', 'max']).round(0)
+                            sueldo_stats = montos.resumen(df_puesto['Total_sueldo_bruto'])
                             st.markdown(f"**Sueldos para {puesto_seleccionado} (filtrado por Gerencia)**:")
-                            st.write(f"- Mínimo: ${sueldo_stats['min']:,.0f}")
-                            st.write(f"- Promedio: ${sueldo_stats['mean']:,.0f}")
-                            st.write(f"- Máximo: ${sueldo_stats['max']:,.0f}")
+                            st.write(f"- Mínimo: ${sueldo_stats['minimo']:,.0f}")
+                            st.write(f"- Promedio: ${sueldo_stats['promedio']:,.0f}")
+                            st.write(f"- Máximo: ${sueldo_stats['maximo']:,.0f}")
                     else:
                         st.warning("No hay datos para el puesto tabla salarial y gerencia seleccionados.")
 
@@ -484,13 +661,37 @@ else:
                     ).properties(height=300)
                     st.altair_chart(especialidad_chart, use_container_width=True)
 
+                if 'Total_sueldo_bruto' in df_filtered.columns and len(agrupadores) > 1:
+                    st.markdown("### Dispersión Salarial por Grupo")
+                    col_a, col_b = st.columns(2)
+                    with col_a:
+                        grupo_a = st.selectbox("Primer agrupador", agrupadores, index=agrupadores.index('Puesto_tabla_salarial') if 'Puesto_tabla_salarial' in agrupadores else 0, key="dispersion_grupo_a")
+                    with col_b:
+                        opciones_b = [col for col in agrupadores if col != grupo_a]
+                        grupo_b = st.selectbox("Segundo agrupador", opciones_b, index=opciones_b.index('seniority') if 'seniority' in opciones_b else 0, key="dispersion_grupo_b")
+
+                    por_grupo, atipicos = analizar_dispersion(version, (grupo_a, grupo_b))
+                    if not por_grupo.empty:
+                        presentes = df_filtered[[grupo_a, grupo_b]].drop_duplicates()
+                        dispersion_grupos = por_grupo.merge(presentes, on=[grupo_a, grupo_b])
+                        dispersion_atipicos = atipicos[atipicos.index.isin(df_filtered.index)]
+
+                    st.caption(f"Percentiles, coeficiente de variación y Gini por {grupo_a} y {grupo_b}. Se marcan con alta dispersión los grupos con CV mayor a {dispersion.UMBRAL_CV:.0f}%.")
+                    st.dataframe(dispersion_grupos)
+                    if len(dispersion_atipicos) > 0:
+                        st.markdown(f"**Personas con sueldo atípico para su grupo** ({len(dispersion_atipicos)}):")
+                        st.dataframe(dispersion_atipicos[[col for col in ['Apellido_y_Nombre', grupo_a, grupo_b, 'Total_sueldo_bruto', 'Mediana_grupo', 'Limite_inferior', 'Limite_superior'] if col in dispersion_atipicos.columns]])
+                    else:
+                        st.write("No hay personas con sueldos atípicos para su grupo.")
+
             else:
                 st.warning("No hay datos para mostrar en el gráfico de comparación por categoría.")
 
             st.subheader("Tabla de Datos Filtrados")
-            st.dataframe(df_filtered)
+            df_mostrar = montos.en_pesos(df_filtered)
+            st.dataframe(df_mostrar)
 
-            csv = df_filtered.to_csv(index=False).encode('utf-8')
+            csv = df_mostrar.to_csv(index=False).encode('utf-8')
             st.download_button(
                 label="Descargar datos filtrados como CSV",
                 data=csv,
@@ -498,108 +699,64 @@ else:
                 mime='text/csv',
             )
 
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df_filtered.to_excel(writer, index=False, sheet_name='Datos Filtrados')
-                resumen = pd.DataFrame({
-                    'Total_personas': [len(df_filtered)],
-                    'Sueldo_Promedio': [promedio_sueldo],
-                    'Sueldo_Mínimo': [minimo_sueldo],
-                    'Sueldo_Máximo': [maximo_sueldo],
-                    'Dispersión_Salarial': [dispersion_sueldo],
-                    'Costo_laboral': [costo_total],
-                    'Porcentaje_<25%': [banda_25],
-                    'Porcentaje_<50%': [banda_50],
-                    'Porcentaje_<75%': [banda_75],
-                    'Porcentaje_≥75%': [banda_arriba_75]
-                })
-                resumen.to_excel(writer, index=False, sheet_name='Resumen')
-            excel_data = output.getvalue()
-            st.download_button(
-                label="Descargar reporte en Excel",
-                data=excel_data,
-                file_name='reporte_sueldos.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            )
-
-            if st.button("Generar reporte en PDF"):
-                pdf = FPDF()
-                pdf.add_page()
-                pdf.set_font("Arial", size=12)
-
-                try:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmpfile:
-                        logo.save(tmpfile.name)
-                        pdf.image(tmpfile.name, x=10, y=8, w=50)
-                    os.unlink(tmpfile.name)
-                except Exception as e:
-                    pdf.cell(200, 10, txt="Logo no disponible", ln=True, align='C')
-
-                pdf.ln(30)
-                def clean_text(text):
-                    return ''.join(c for c in str(text) if ord(c) < 128)
-
-                pdf.cell(200, 10, txt=clean_text("Reporte de Sueldos - Sueldos para Informes"), ln=True, align='C')
-                pdf.ln(10)
-                pdf.cell(200, 10, txt=clean_text(f"Total personas: {len(df_filtered)}"), ln=True)
-                pdf.cell(200, 10, txt=clean_text(f"Sueldo promedio: ${promedio_sueldo:,.0f}"), ln=True)
-                pdf.cell(200, 10, txt=clean_text(f"Sueldo mínimo / máximo: ${minimo_sueldo:,.0f} / ${maximo_sueldo:,.0f}"), ln=True)
-                pdf.cell(200, 10, txt=clean_text(f"Dispersión salarial: ${dispersion_sueldo:,.0f} ({dispersion_porcentaje:.1f}%)"), ln=True)
-                pdf.cell(200, 10, txt=clean_text(f"Costo laboral total: ${costo_total:,.0f}"), ln=True)
-                pdf.cell(200, 10, txt=clean_text(f"Porcentaje <25%: {banda_25:.1f}%"), ln=True)
-                pdf.cell(200, 10, txt=clean_text(f"Porcentaje <50%: {banda_50:.1f}%"), ln=True)
-                pdf.cell(200, 10, txt=clean_text(f"Porcentaje <75%: {banda_75:.1f}%"), ln=True)
-                pdf.cell(200, 10, txt=clean_text(f"Porcentaje ≥75%: {banda_arriba_75:.1f}%"), ln=True)
-
-                if len(df_filtered) < 20 and all(col in df_filtered.columns for col in ['Personaapellido', 'Personanombre', 'Puesto', 'Seniority', 'Porcentaje_Banda_Salarial', 'Total_sueldo_bruto']):
-                    pdf.ln(20)
-                    pdf.set_font("Arial", size=10)
-                    pdf.cell(200, 10, txt="Detalles de Personas (ordenado por Total Sueldo Bruto descendente)", ln=True, align='C')
-                    pdf.ln(5)
-
-                    columns = ['Personaapellido', 'Personanombre', 'Puesto', 'Seniority', 'Porcentaje_Banda_Salarial', 'Total_sueldo_bruto']
-                    df_table = df_filtered[columns].sort_values(by='Total_sueldo_bruto', ascending=False)
-                    pdf.set_font("Arial", size=8)
-
-                    for col in columns:
-                        pdf.cell(33, 10, clean_text(col.replace('_', ' ').title()), border=1, align='C')
-                    pdf.ln()
-
-                    for index, row in df_table.iterrows():
-                        pdf.cell(33, 10, clean_text(str(row['Personaapellido'])), border=1)
-                        pdf.cell(33, 10, clean_text(str(row['Personanombre'])), border=1)
-                        pdf.cell(33, 10, clean_text(str(row['Puesto'])), border=1)
-                        pdf.cell(33, 10, clean_text(str(row['Seniority'])), border=1)
-                        pdf.cell(33, 10, clean_text(f"{row['Porcentaje_Banda_Salarial']*100:.1f}%"), border=1)
-                        pdf.cell(35, 10, clean_text(f"${row['Total_sueldo_bruto']:,.0f}"), border=1)
-                        pdf.ln()
-
-                try:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmpfile:
-                        pdf.output(tmpfile.name)
-                        with open(tmpfile.name, "rb") as f:
-                            st.download_button(
-                                label="Descargar reporte en PDF",
-                                data=f.read(),
-                                file_name="reporte_sueldos.pdf",
-                                mime="application/pdf"
-                            )
-                    os.unlink(tmpfile.name)
-                except Exception as e:
-                    st.error(f"Error al generar el PDF: {str(e)}")
+            # Excel y PDF se generan en la cola de tareas; la clave incluye versión y filtros
+            cola = get_cola_tareas()
+            clave_excel = clave_tarea('excel_fc', version, filtros)
+            clave_pdf = clave_tarea('pdf_fc', version, filtros)
+            col_excel, col_pdf, col_paquete = st.columns(3)
+            with col_excel:
+                if st.button("Preparar reporte en Excel"):
+                    cola.enviar(clave_excel, excel_sueldos_fc, df_filtered, metricas, descripcion="Reporte de sueldos en Excel")
+                mostrar_tarea(clave_excel, "Descargar reporte en Excel", 'reporte_sueldos.xlsx',
+                              'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+            with col_pdf:
+                if st.button("Generar reporte en PDF"):
+                    cola.enviar(clave_pdf, pdf_sueldos_fc, df_filtered, metricas, descripcion="Reporte de sueldos en PDF")
+                mostrar_tarea(clave_pdf, "Descargar reporte en PDF", "reporte_sueldos.pdf", "application/pdf")
+            with col_paquete:
+                # Suma los totales de Sueldos Todos y la Tabla Salarial vigentes en el catálogo
+                catalogo = get_catalogo()
+                fuentes_paquete = {}
+                for nombre in ['sueldos_todos', 'tabla_salarial']:
+                    try:
+                        fuentes_paquete[nombre] = catalogo.obtener(nombre)
+                    except (FileNotFoundError, ArchivoInvalido):
+                        fuentes_paquete[nombre] = (None, None)
+                clave_paquete = clave_tarea('paquete', version, fuentes_paquete['sueldos_todos'][0],
+                                            fuentes_paquete['tabla_salarial'][0], filtros)
+                if st.button("Preparar paquete consolidado"):
+                    df_todos = fuentes_paquete['sueldos_todos'][1]
+                    if df_todos is not None:
+                        df_todos = df_todos.fillna({col: 0 for col in ['total_sueldo_bruto', 'neto', 'total_costo_laboral'] if col in df_todos.columns})
+                    cola.enviar(clave_paquete, paquete_consolidado, df_filtered, metricas, agrupadores,
+                                df_todos, fuentes_paquete['tabla_salarial'][1], descripcion="Paquete consolidado de sueldos")
+                mostrar_tarea(clave_paquete, "Descargar paquete consolidado", 'paquete_sueldos.xlsx',
+                              'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
 
             st.markdown("### Conclusión Final")
             if len(df_filtered) > 0:
+                alta_dispersion = dispersion_grupos[dispersion_grupos['Alta_dispersion']].head(3) if not dispersion_grupos.empty else dispersion_grupos
+                if len(alta_dispersion) > 0:
+                    grupos_texto = ", ".join(
+                        f"**{row[grupo_a]} / {row[grupo_b]}** (CV {row['CV_%']:.0f}%)" for _, row in alta_dispersion.iterrows()
+                    )
+                    recomendacion = f"Revisar los grupos con mayor dispersión salarial: {grupos_texto}"
+                else:
+                    recomendacion = "No se detectan grupos con alta dispersión salarial con los filtros actuales"
+                if len(dispersion_atipicos) > 0:
+                    recomendacion += f", y las **{len(dispersion_atipicos)}** personas con sueldo atípico para su grupo listadas en Dispersión Salarial por Grupo."
+                else:
+                    recomendacion += "."
                 conclusion = f"""
                 - Se analizaron **{len(df_filtered)}** empleados.
-                - El sueldo bruto promedio es **${promedio_sueldo:,.0f}**.
-                - El costo laboral total asciende a **${costo_total:,.0f}**.
+                - El sueldo bruto promedio es **${metricas['promedio_sueldo']:,.0f}**.
+                - El costo laboral total asciende a **${metricas['costo_total']:,.0f}**.
                 - La distribución de bandas salariales muestra que:
-                  - **{banda_25:.1f}%** está por debajo del 25% de la banda.
-                  - **{banda_50:.1f}%** está por debajo del 50%.
-                  - **{banda_75:.1f}%** está por debajo del 75%.
-                  - **{banda_arriba_75:.1f}%** está por encima del 75%.
-                - **Recomendación**: Revisar los puestos con alta dispersión salarial y seniority bajo para ajustar políticas de compensación.
+                  - **{metricas['banda_25']:.1f}%** está por debajo del 25% de la banda.
+                  - **{metricas['banda_50']:.1f}%** está por debajo del 50%.
+                  - **{metricas['banda_75']:.1f}%** está por debajo del 75%.
+                  - **{metricas['banda_arriba_75']:.1f}%** está por encima del 75%.
+                - **Recomendación**: {recomendacion}
                 """
                 st.markdown(conclusion)
             else:
@@ -607,27 +764,87 @@ else:
 
             st.markdown('</div>', unsafe_allow_html=True)
 
+    # --- Página: Simulador de Aumentos ---
+    elif page == "Simulador de Aumentos":
+        mostrar_titulo_principal()
+        st.title("Simulador de Aumentos Salariales")
+
+        version, df = obtener_fuente('sueldos_fc')
+        vigilar_version('sueldos_fc', version)
+
+        # El simulador vive en la sesión: al editar las reglas sólo se recalculan los grupos afectados
+        if st.session_state.get('simulador_version') != version:
+            st.session_state.simulador = Simulador(df)
+            st.session_state.simulador_version = version
+        simulador = st.session_state.simulador
+
+        st.markdown("### Reglas del escenario")
+        st.caption("Cada regla aplica un porcentaje de aumento a un grupo. Piso y tope limitan el monto del aumento por persona. Si varias reglas alcanzan a una persona, los aumentos se suman.")
+        opciones_valor = sorted({str(v) for criterio in CRITERIOS for v in simulador.valores[criterio]})
+        reglas = st.data_editor(
+            pd.DataFrame({
+                'criterio': pd.Series(dtype='object'),
+                'valor': pd.Series(dtype='object'),
+                'porcentaje': pd.Series(dtype='float64'),
+                'piso': pd.Series(dtype='float64'),
+                'tope': pd.Series(dtype='float64'),
+            }),
+            num_rows="dynamic",
+            use_container_width=True,
+            key="reglas_simulador",
+            column_config={
+                'criterio': st.column_config.SelectboxColumn("Criterio", options=CRITERIOS, required=True),
+                'valor': st.column_config.SelectboxColumn("Grupo", options=opciones_valor, required=True),
+                'porcentaje': st.column_config.NumberColumn("Aumento %", min_value=-100.0, step=0.5, format="%.1f%%", required=True),
+                'piso': st.column_config.NumberColumn("Piso ($)", min_value=0.0, format="$%.0f"),
+                'tope': st.column_config.NumberColumn("Tope ($)", min_value=0.0, format="$%.0f"),
+            },
+        )
+        reglas = reglas.to_dict('records')
+        sin_filas = [f"{r['criterio']} = {r['valor']}" for r in reglas
+                     if r.get('criterio') in CRITERIOS and isinstance(r.get('valor'), str) and len(simulador.filas_de(r['criterio'], r['valor'])) == 0]
+        if sin_filas:
+            st.warning(f"Estas reglas no alcanzan a ninguna persona: {', '.join(sin_filas)}")
+
+        simulador.aplicar(reglas)
+        resumen = simulador.resumen()
+
+        st.markdown("### Resultado del escenario")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total Sueldo Bruto Simulado", f"${resumen['Total_bruto_simulado']:,.0f}", f"{resumen['Aumento_%']:.2f}%")
+        col2.metric("Aumento Total", f"${resumen['Aumento_total']:,.0f}")
+        col3.metric("Costo Laboral Simulado", f"${resumen['Costo_laboral_simulado']:,.0f}")
+        col4.metric("Sueldo Bruto Promedio", f"${resumen['Sueldo_promedio']:,.0f}")
+
+        col5, col6, col7 = st.columns(3)
+        col5.metric("Sueldo Mínimo / Máximo", f"${resumen['Sueldo_minimo']:,.0f} / ${resumen['Sueldo_maximo']:,.0f}")
+        col6.metric("Dispersión Salarial", f"{resumen['Dispersion_%']:.1f}%")
+        col7.metric("Coeficiente de Variación", f"{resumen['Coeficiente_variacion_%']:.1f}%")
+
+        st.markdown("### Distribución de Bandas Salariales Simulada")
+        banda_data = pd.DataFrame({
+            'Categoría': CATEGORIAS_BANDA,
+            'Porcentaje': [resumen['Bandas_%'][categoria] for categoria in CATEGORIAS_BANDA]
+        })
+        banda_chart = alt.Chart(banda_data).mark_bar().encode(
+            x=alt.X('Categoría:N', title='Banda Salarial', sort=CATEGORIAS_BANDA),
+            y=alt.Y('Porcentaje:Q', title='Porcentaje (%)'),
+            tooltip=['Categoría', alt.Tooltip('Porcentaje:Q', format='.1f')]
+        ).properties(height=300)
+        st.altair_chart(banda_chart, use_container_width=True)
+
+        st.markdown("### Impacto por Grupo")
+        criterio_resumen = st.selectbox("Agrupar por", [c for c in CRITERIOS if c != 'Banda'])
+        st.dataframe(simulador.por_grupo(criterio_resumen))
+
     # --- Página: Sueldos Todos ---
     elif page == "Sueldos Todos":
         mostrar_titulo_principal()
         st.title("Análisis Salarial Personal Clusterciar")
 
-        @st.cache_data
-        def load_sueldos_data():
-            try:
-                return pd.read_excel("sueldos.xlsx", sheet_name=0)
-            except Exception as e:
-                st.error(f"Error al intentar cargar sueldos.xlsx: {str(e)}")
-                return None
-
-        df = load_sueldos_data()
-        if df is None:
-            st.error("No se pudo cargar el archivo sueldos.xlsx. Verifica que el archivo exista y sea accesible.")
-            st.stop()
-
-        df.columns = df.columns.str.strip().str.replace(' ', '_').lower()
-        if 'convenio' in df.columns:
-            df = df.rename(columns={'convenio': 'categoria'})
+        version, df = obtener_fuente('sueldos_todos')
+        df = df.copy()
+        vigilar_version('sueldos_todos', version)
 
         categorical_columns = ['categoria', 'es_cvh', 'personaapellido', 'personanombre', 'comitente']
         for col in categorical_columns:
@@ -640,13 +857,13 @@ else:
         numeric_columns = ['total_sueldo_bruto', 'neto', 'total_costo_laboral']
         for col in numeric_columns:
             if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0))
+                df[col] = df[col].fillna(0)
             else:
                 df[col] = 0
 
         st.subheader("Filtros")
         filtros = {}
-        filter_columns = ['empresa', 'es_cvh', 'apellido_y_nombre', 'comitente']
+        filter_columns = ['empresa', 'es_cvh', 'apellido_nombre', 'comitente']
         for col in filter_columns:
             if col in df.columns:
                 unique_values = [x for x in df[col].dropna().unique() if str(x).strip() != 'Sin dato']
@@ -666,9 +883,9 @@ else:
         st.subheader("Resumen General - Sueldos")
         if len(df_filtered) > 0:
             cantidad_personas = len(df_filtered)
-            total_sueldo_bruto = df_filtered['total_sueldo_bruto'].sum()
-            total_sueldo_neto = df_filtered['neto'].sum()
-            total_costo_laboral = df_filtered['total_costo_laboral'].sum()
+            total_sueldo_bruto = montos.suma(df_filtered['total_sueldo_bruto'])
+            total_sueldo_neto = montos.suma(df_filtered['neto'])
+            total_costo_laboral = montos.suma(df_filtered['total_costo_laboral'])
             sueldo_bruto_promedio = total_sueldo_bruto / cantidad_personas if cantidad_personas > 0 else 0
             sueldo_neto_promedio = total_sueldo_neto / cantidad_personas if cantidad_personas > 0 else 0
             costo_laboral_promedio = total_costo_laboral / cantidad_personas if cantidad_personas > 0 else 0
@@ -685,18 +902,19 @@ else:
             col7.metric("Costo Laboral Promedio", f"${costo_laboral_promedio:,.0f}")
 
             st.subheader("Tabla de Datos Filtrados")
-            display_columns = ['empresa', 'es_cvh', 'apellido_y_nombre', 'comitente', 'total_sueldo_bruto', 'neto', 'total_costo_laboral']
-            st.dataframe(df_filtered[display_columns].rename(columns={
+            display_columns = ['empresa', 'es_cvh', 'apellido_nombre', 'comitente', 'total_sueldo_bruto', 'neto', 'total_costo_laboral']
+            df_mostrar = montos.en_pesos(df_filtered[display_columns])
+            st.dataframe(df_mostrar.rename(columns={
                 'empresa': 'Empresa',
                 'es_cvh': 'Cvh',
-                'apellido_y_nombre': 'Apellido y Nombre',
+                'apellido_nombre': 'Apellido y Nombre',
                 'comitente': 'Comitente',
                 'total_sueldo_bruto': 'Total Sueldo Bruto',
                 'neto': 'Neto',
                 'total_costo_laboral': 'Total Costo Laboral'
             }))
 
-            csv = df_filtered[display_columns].to_csv(index=False).encode('utf-8')
+            csv = df_mostrar.to_csv(index=False).encode('utf-8')
             st.download_button(
                 label="Descargar datos filtrados como CSV",
                 data=csv,
@@ -704,58 +922,77 @@ else:
                 mime='text/csv',
             )
 
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df_filtered[display_columns].to_excel(writer, index=False, sheet_name='Datos Filtrados')
-            excel_data = output.getvalue()
-            st.download_button(
-                label="Descargar datos filtrados como Excel",
-                data=excel_data,
-                file_name='sueldos_filtrados.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            )
+            exportar_excel(clave_tarea('excel_todos', version, filtros), [('Datos Filtrados', df_mostrar)],
+                           "Preparar datos filtrados en Excel", "Descargar datos filtrados como Excel",
+                           'sueldos_filtrados.xlsx', "Sueldos Todos filtrados en Excel")
         else:
             st.info("No hay datos disponibles con los filtros actuales.")
 
+    # --- Página: Conciliación ---
+    elif page == "Conciliación":
+        mostrar_titulo_principal()
+        st.title("Conciliación Sueldos Todos / Sueldos FC")
+
+        # El cruce se cachea por versión de ambos libros y tolerancia
+        @st.cache_data(max_entries=8)
+        def conciliar_fuentes(version_fc, version_todos, tolerancia):
+            catalogo = get_catalogo()
+            return conciliar(catalogo.obtener('sueldos_fc')[1], catalogo.obtener('sueldos_todos')[1], tolerancia)
+
+        version_fc = obtener_fuente('sueldos_fc')[0]
+        version_todos = obtener_fuente('sueldos_todos')[0]
+        vigilar_version('sueldos_fc', version_fc)
+        vigilar_version('sueldos_todos', version_todos)
+
+        tolerancia = st.number_input("Tolerancia por concepto ($)", min_value=0.0, value=1.0, step=1.0)
+        resultado = conciliar_fuentes(version_fc, version_todos, tolerancia)
+        resumen = resultado['resumen']
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Personas en ambas fuentes", resumen['En_ambas'])
+        col2.metric("Con diferencias", resumen['Con_diferencias'])
+        col3.metric("Sólo en Sueldos FC", resumen['Solo_FC'])
+        col4.metric("Sólo en Sueldos Todos", resumen['Solo_Todos'])
+        st.caption(f"Conceptos comparados: {', '.join(c.replace('_', ' ') for c in resumen['Conceptos'])}. Las personas se cruzan por apellido y nombre sin acentos ni mayúsculas.")
+
+        st.subheader("Diferencias por Persona")
+        if len(resultado['diferencias']) > 0:
+            st.dataframe(resultado['diferencias'])
+        else:
+            st.info("No hay diferencias por encima de la tolerancia.")
+
+        st.subheader("Personas sólo en Sueldos FC")
+        st.dataframe(resultado['solo_fc'])
+        st.subheader("Personas sólo en Sueldos Todos")
+        st.dataframe(resultado['solo_todos'])
+
+        hojas = [
+            ('Diferencias', resultado['diferencias']),
+            ('Solo FC', resultado['solo_fc']),
+            ('Solo Todos', resultado['solo_todos']),
+        ]
+        exportar_excel(clave_tarea('excel_conciliacion', version_fc, version_todos, tolerancia), hojas,
+                       "Preparar conciliación en Excel", "Descargar conciliación en Excel",
+                       'conciliacion_sueldos.xlsx', "Conciliación en Excel")
+
     # --- Página: Comparar Personas ---
     elif page == "Comparar Personas":
         mostrar_titulo_principal()
         st.title("Comparar Personas")
 
-        @st.cache_data
-        def load_data():
-            try:
-                return pd.read_excel("SUELDOS PARA INFORMES.xlsx", sheet_name=0)
-            except FileNotFoundError:
-                st.error("No se encontró el archivo SUELDOS PARA INFORMES.xlsx. Asegúrate de que esté en el directorio raíz del repositorio.")
-                return None
-            except Exception as e:
-                st.error(f"Error al cargar SUELDOS PARA INFORMES.xlsx: {str(e)}")
-                return None
-
-        df = load_data()
-        if df is None:
-            st.stop()
+        version, df = obtener_fuente('sueldos_fc')
+        # Esta página sólo muestra sueldos individuales: se pasan a pesos una vez
+        df = montos.en_pesos(df)
+        vigilar_version('sueldos_fc', version)
 
-        df.columns = df.columns.str.strip().str.replace(' ', '_')
-        required_columns = ['Gerencia', 'Puesto_tabla_salarial', 'Grupo', 'seniority', 'Personaapellido', 'Personanombre']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            st.error(f"Faltan las siguientes columnas en el archivo SUELDOS PARA INFORMES.xlsx: {missing_columns}")
-            st.stop()
-
-        categorical_columns = [
-            'Empresa', 'CCT', 'Grupo', 'Comitente', 'Puesto', 'seniority', 'Gerencia', 'CVH',
-            'Puesto_tabla_salarial', 'Locacion', 'Centro_de_Costos', 'Especialidad', 'Superior',
-            'Personaapellido', 'Personanombre'
-        ]
+        categorical_columns = ingesta.COLUMNAS_CATEGORICAS_FC
         for col in categorical_columns:
             if col in df.columns:
                 df[col] = df[col].astype(str).replace(['#Ref', 'nan', 'NaN', ''], 'Sin dato')
             else:
                 df[col] = 'Sin dato'
 
-        df['Apellido_y_Nombre'] = df['Personaapellido'] + ' ' + df['Personanombre']
+        df['Apellido_y_Nombre'] = nombres_completos(df)
         st.subheader("Filtros Previos")
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -792,15 +1029,26 @@ else:
         )
 
         if comparison_type == "Comparar dos personas":
-            nombres_completos = sorted([x for x in df_filtered['Apellido_y_Nombre'].unique() if x != 'Sin dato Sin dato'])
-            if not nombres_completos:
+            disponibles = set(df_filtered['Apellido_y_Nombre'].unique()) - {'Sin dato Sin dato'}
+            if not disponibles:
                 st.warning("No hay nombres completos disponibles para comparar. Verifica los datos en las columnas 'Personaapellido' y 'Personanombre'.")
                 st.stop()
+            indice = indice_nombres('comparar_personas', version, df['Apellido_y_Nombre'])
+
+            # Sin búsqueda se listan los primeros nombres; al escribir se consultan las coincidencias
+            def elegir_persona(key):
+                consulta = st.text_input("Buscar Apellido y Nombre", key=f"buscar_{key}")
+                if consulta.strip():
+                    opciones = indice.buscar(consulta, limite=50, permitidos=disponibles)
+                else:
+                    opciones = sorted(disponibles)[:50]
+                return st.selectbox("Selecciona Apellido y Nombre", opciones, key=key)
+
             col1, col2 = st.columns(2)
             with col1:
-                persona_1 = st.selectbox("Selecciona Apellido y Nombre", nombres_completos, key="persona_1")
+                persona_1 = elegir_persona("persona_1")
             with col2:
-                persona_2 = st.selectbox("Selecciona Apellido y Nombre", nombres_completos, key="persona_2")
+                persona_2 = elegir_persona("persona_2")
 
             df_persona_1 = df_filtered[df_filtered['Apellido_y_Nombre'] == persona_1]
             df_persona_2 = df_filtered[df_filtered['Apellido_y_Nombre'] == persona_2]
@@ -843,11 +1091,11 @@ else:
 
                 chart = alt.Chart(df_filtered).mark_bar().encode(
                     x=alt.X('Nombre_Completo:N', title='Persona', sort='-y', axis=alt.Axis(labelAngle=45)),
-                    y=alt.Y('Total_sueldo_bruto:Q', title='Sueldo Bruto ($)''),
+                    y=alt.Y('Total_sueldo_bruto:Q', title='Sueldo Bruto ($)'),
                     tooltip=[
                         'Nombre_Completo',
                         alt.Tooltip('Total_sueldo_bruto:Q', title='Sueldo Bruto', format='$,.0f'),
-                        st'P',
+                        'Puesto',
                         'Gerencia',
                         'seniority'
                     ]
@@ -859,29 +1107,92 @@ else:
 
                 st.subheader("Datos Detallados")
                 display_columns = ['Nombre_Completo', 'Total_sueldo_bruto', 'seniority', 'Puesto', 'Gerencia']
-                st.dataframe(df_filtered[display])
+                st.dataframe(df_filtered[display_columns])
 
             else:
                 st.warning("No hay datos disponibles para comparar con los filtros seleccionados.")
 
-    # --- Página: Tabla Salarial ---
-    elif page == "Tabla Salarial":
+    # --- Página: Evolución Histórica ---
+    elif page == "Evolución Histórica":
         mostrar_titulo_principal()
-        st.title("Consulta de Tabla Salarial")
+        st.title("Evolución Histórica de Sueldos")
+
+        historico = get_historico()
+        get_catalogo()
+
+        @st.cache_data(max_entries=32)
+        def comparar_historico(version_historico, fuente, grupo, valor, periodos):
+            return comparar_periodos(get_historico(), fuente, grupo, valor, list(periodos))
+
+        fuentes = {"Sueldos Todos": 'sueldos_todos', "Sueldos FC": 'sueldos_fc'}
+        fuente = fuentes[st.selectbox("Fuente", list(fuentes))]
+        config = FUENTES_HISTORICO[fuente]
+        if fuente in historico.errores:
+            st.error(f"No se pudo archivar automáticamente el último libro de esta fuente: {historico.errores[fuente]}")
+
+        with st.expander("Agregar un período anterior"):
+            archivo = st.file_uploader("Libro mensual (.xlsx)", type=['xlsx'], key=f"historico_archivo_{fuente}")
+            periodo_manual = st.text_input("Período (AAAA-MM)", placeholder="2025-03", key=f"historico_periodo_{fuente}")
+            st.caption("Obligatorio si el libro no trae la columna de período (Sueldos FC). "
+                       "Indicarlo para un libro ya archivado corrige su período.")
+            if archivo is not None and st.button("Agregar al histórico"):
+                try:
+                    periodo = historico.registrar_contenido(fuente, archivo.getvalue(), periodo_manual or None)
+                    if periodo is None:
+                        st.info("Ese archivo ya estaba en el histórico.")
+                    else:
+                        st.success(f"Se agregó el período {periodo}.")
+                except Exception as e:
+                    st.error(f"No se pudo agregar el archivo: {str(e)}")
 
-        @st.cache_data
-        def load_tabla_salarial():
-            return pd.read_excel("tabla salarial.xlsx", sheet_name=0)
+        periodos_disponibles = historico.periodos(fuente)
+        if not periodos_disponibles:
+            st.info("Todavía no hay períodos archivados para esta fuente.")
+            st.stop()
 
-        try:
-            df_tabla = load_tabla_salarial()
-        except FileNotFoundError:
-            st.error("No se encontró el archivo tabla salarial.xlsx")
+        col1, col2 = st.columns(2)
+        with col1:
+            grupo = st.selectbox("Agrupar por", config['grupos'], index=config['grupos'].index('Gerencia') if 'Gerencia' in config['grupos'] else 0)
+        with col2:
+            valor = st.selectbox("Valor", [v for v in config['valores'] if v != 'Porcentaje_Banda_Salarial'])
+        periodos = st.multiselect("Períodos a comparar", periodos_disponibles, default=periodos_disponibles[-12:])
+        if not periodos:
+            st.warning("Selecciona al menos un período.")
+            st.stop()
+
+        evolucion, resumen = comparar_historico(historico.version(), fuente, grupo, valor, tuple(sorted(periodos)))
+        if evolucion.empty:
+            st.warning("No hay datos para los períodos seleccionados.")
             st.stop()
 
-git add app.py
-git commit -m "Fix Tabla Salarial column handling"
-git push origin main
+        st.markdown(f"### Promedio de {valor.replace('_', ' ')} por {grupo.replace('_', ' ')}")
+        chart = alt.Chart(evolucion).mark_line(point=True).encode(
+            x=alt.X('periodo:O', title='Período'),
+            y=alt.Y('Promedio:Q', title='Promedio'),
+            color=alt.Color(f'{grupo}:N', title=grupo),
+            tooltip=[grupo, 'periodo', alt.Tooltip('Promedio:Q', format=',.0f'), 'Dotacion']
+        ).properties(height=400)
+        st.altair_chart(chart, use_container_width=True)
+
+        if len(periodos) > 1:
+            st.markdown(f"### Variación entre {min(periodos)} y {max(periodos)}")
+            st.dataframe(resumen)
+            dotacion_chart = alt.Chart(resumen).mark_bar().encode(
+                x=alt.X(f'{grupo}:N', title=grupo, sort='-y'),
+                y=alt.Y('Dotacion_Delta:Q', title='Variación de dotación'),
+                tooltip=[grupo, 'Dotacion_Delta', alt.Tooltip('Crecimiento_%:Q', format='.1f')]
+            ).properties(height=300)
+            st.altair_chart(dotacion_chart, use_container_width=True)
+        else:
+            st.info("Selecciona dos o más períodos para ver crecimiento, dotación y deriva de bandas.")
+
+    # --- Página: Tabla Salarial ---
+    elif page == "Tabla Salarial":
+        mostrar_titulo_principal()
+        st.title("Consulta de Tabla Salarial")
+
+        version, df_tabla = obtener_fuente('tabla_salarial')
+        vigilar_version('tabla_salarial', version)
 
         puestos = sorted(df_tabla['Puesto'].unique())
         seniorities = sorted(df_tabla['Seniority'].unique())
@@ -897,15 +1208,10 @@ git push origin main
         with col3:
             selected_locacion_1 = st.selectbox("Selecciona una Locación (1)", locaciones, key="locacion_1")
 
-        df_selected_1 = df_tabla[
-            (df_tabla['Puesto'] == selected_puesto_1) &
-            (df_tabla['Seniority'] == selected_seniority_1) &
-            (df_tabla['Locacion'] == selected_locacion_1]
-        )
+        valores_1 = analitica.valores_tabla(df_tabla, selected_puesto_1, selected_seniority_1, selected_locacion_1)
 
-        if not df_selected_1.empty:
+        if valores_1 is not None:
             st.markdown(f"**Valores Salariales para {selected_puesto_1} - {selected_seniority_1} - {selected_locacion_1}**")
-            valores_1 = df_selected_1[['Q1', 'Q2', 'Q3', 'Q4', 'Q5']].iloc[0]
             col1, col2, col3, col4, col5 = st.columns(5)
             col1.metric("Q1", f"${valores_1['Q1']:,.0f}")
             col2.metric("Q2", f"${valores_1['Q2']:,.0f}")
@@ -914,7 +1220,6 @@ git push origin main
             col5.metric("Q5", f"${valores_1['Q5']:,.0f}")
         else:
             st.warning(f"No se encontraron datos para {selected_puesto_1} con Seniority {selected_seniority_1} en Locación {selected_locacion_1}.")
-            valores_1 = None
 
         st.markdown("**Segunda Selección**")
         col1, col2, col3 = st.columns(3)
@@ -925,31 +1230,23 @@ git push origin main
         with col3:
             selected_locacion_2 = st.selectbox("Selecciona una Locación (2)", locaciones, key="locacion_2")
 
-        df_selected_2 = df_tabla[
-            (df_tabla['Puesto'] == selected_puesto_2) &
-            (df_tabla['Seniority'] == selected_seniority_2) &
-            (df_tabla['Locacion'] == selected_locacion_2]
-        )
+        valores_2 = analitica.valores_tabla(df_tabla, selected_puesto_2, selected_seniority_2, selected_locacion_2)
 
-        if not df_selected_2.empty:
+        if valores_2 is not None:
             st.markdown(f"**Valores Salariales para {selected_puesto_2} - {selected_seniority_2} - {selected_locacion_2}**")
-            valores_2 = df_selected_2[['Q1', 'Q2', 'Q3', 'Q4', 'Q5']].iloc[0]
             col1, col2, col3, col4, col5 = st.columns(5)
-            col1.metric("Q1, "Q", f"${valores_2:,.0f}")
+            col1.metric("Q1", f"${valores_2['Q1']:,.0f}")
             col2.metric("Q2", f"${valores_2['Q2']:,.0f}")
             col3.metric("Q3", f"${valores_2['Q3']:,.0f}")
             col4.metric("Q4", f"${valores_2['Q4']:,.0f}")
             col5.metric("Q5", f"${valores_2['Q5']:,.0f}")
         else:
             st.warning(f"No se encontraron datos para {selected_puesto_2} con Seniority {selected_seniority_2} en Locación {selected_locacion_2}.")
-            valores_2 = None
 
         if valores_1 is not None and valores_2 is not None:
             st.markdown("### Comparativa de Sueldos")
-            promedio_1 = valores_1[['Q1', 'Q2', 'Q3', 'Q4', 'Q5']].mean()
-            promedio_2 = valores_2[['Q1', 'Q2', 'Q3', 'Q4', 'Q5']].mean()
-            if promedio_1 != 0:
-                porcentaje_diferencia = ((promedio_2 - promedio_1) / promedio_1) * 100
+            porcentaje_diferencia = analitica.diferencia_tabla(valores_1, valores_2)
+            if porcentaje_diferencia is not None:
                 st.markdown(f"**Diferencia porcentual (basada en el promedio de Q1-Q5):** {porcentaje_diferencia:.2f}%")
                 if porcentaje_diferencia > 0:
                     st.write(f"El promedio de la segunda selección es {porcentaje_diferencia:.2f}% mayor que el de la primera.")
@@ -973,15 +1270,6 @@ git push origin main
                 mime='text/csv',
             )
         with col2:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                df_tabla.to_excel(writer, index=False, sheet_name='Tabla Salarial')
-            )
-            excel_data = output.getvalue()
-            st.download_button(
-                label="Descargar tabla salarial completa como Excel",
-                data=excel_data,
-                file_name='tabla_salarial.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            )
-```
+            exportar_excel(clave_tarea('excel_tabla', version), [('Tabla Salarial', df_tabla)],
+                           "Preparar tabla salarial completa en Excel", "Descargar tabla salarial completa como Excel",
+                           'tabla_salarial.xlsx', "Tabla salarial en Excel")
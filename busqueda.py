@@ -0,0 +1,93 @@
+# Índice de búsqueda de nombres de personas.
+# Se arma una vez por versión del libro y resuelve en el servidor la búsqueda
+# por prefijo de cada palabra, sin distinguir mayúsculas ni acentos, con un
+# respaldo aproximado por trigramas para tolerar errores de tipeo.
+import bisect
+import difflib
+import unicodedata
+from collections import Counter
+
+# Similitud mínima (0 a 1) para aceptar una coincidencia aproximada
+UMBRAL_SIMILITUD = 0.75
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def _trigramas(texto):
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+# Arma "APELLIDO Nombre" a partir de las columnas separadas del libro.
+def nombres_completos(df, apellido='Personaapellido', nombre='Personanombre'):
+    return df[apellido].astype(str).str.strip() + ' ' + df[nombre].astype(str).str.strip()
+
+
+class IndiceNombres:
+    def __init__(self, nombres):
+        self.nombres = sorted({str(n) for n in nombres if str(n).strip()})
+        self.normalizados = [normalizar(n) for n in self.nombres]
+        self._palabras = [norm.split() for norm in self.normalizados]
+
+        pares = []
+        self._trigramas = {}
+        for i, norm in enumerate(self.normalizados):
+            for palabra in set(self._palabras[i]):
+                pares.append((palabra, i))
+            for trigrama in _trigramas(norm):
+                self._trigramas.setdefault(trigrama, []).append(i)
+        pares.sort()
+        self._claves = [palabra for palabra, _ in pares]
+        self._ids = [i for _, i in pares]
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def _por_prefijo(self, palabra):
+        inicio = bisect.bisect_left(self._claves, palabra)
+        fin = bisect.bisect_left(self._claves, palabra + '\uffff')
+        return set(self._ids[inicio:fin])
+
+    def _similitud(self, palabras_consulta, i):
+        palabras = self._palabras[i]
+        return sum(
+            max(difflib.SequenceMatcher(None, consulta, palabra).ratio() for palabra in palabras)
+            for consulta in palabras_consulta
+        ) / len(palabras_consulta)
+
+    # Devuelve hasta `limite` nombres que tienen cada palabra de la consulta
+    # como prefijo de alguna de sus palabras, en orden alfabético. Sólo si no
+    # hay ninguno se buscan aproximados por similitud, para tolerar errores de
+    # tipeo sin mezclar nombres que no tienen que ver. `permitidos` restringe
+    # el resultado a un subconjunto de nombres, por ejemplo el ya filtrado.
+    def buscar(self, consulta, limite=20, permitidos=None):
+        consulta = normalizar(consulta)
+        if not consulta:
+            return []
+        palabras_consulta = consulta.split()
+
+        ids = None
+        for palabra in palabras_consulta:
+            ids = self._por_prefijo(palabra) if ids is None else ids & self._por_prefijo(palabra)
+            if not ids:
+                break
+        exactos = sorted(ids or ())
+        resultados = [self.nombres[i] for i in exactos if permitidos is None or self.nombres[i] in permitidos]
+        if resultados:
+            return resultados[:limite]
+
+        conteo = Counter()
+        for trigrama in _trigramas(consulta):
+            conteo.update(self._trigramas.get(trigrama, ()))
+        candidatos = [i for i, _ in conteo.most_common(limite * 5)]
+        puntajes = sorted(((self._similitud(palabras_consulta, i), i) for i in candidatos), reverse=True)
+        for puntaje, i in puntajes:
+            if puntaje < UMBRAL_SIMILITUD or len(resultados) >= limite:
+                break
+            if permitidos is None or self.nombres[i] in permitidos:
+                resultados.append(self.nombres[i])
+        return resultados
@@ -0,0 +1,134 @@
+# Validación de las fuentes al ingerirlas.
+# Cada esquema de ingesta.py declara en 'validacion' las columnas obligatorias
+# y las columnas de montos. Al leer un libro se arma una sola vez un reporte
+# de calidad (columnas faltantes, nulos, celdas '#Ref', valores que no
+# respetan el tipo declarado y montos negativos o fuera de rango); si hay
+# errores el libro se rechaza y el catálogo conserva la versión anterior.
+import io
+
+import pandas as pd
+
+import ingesta
+import montos
+
+MARCA_REF = '#Ref'
+# Montos mensuales por encima de este valor se consideran inverosímiles
+TOPE_MONTO = 500_000_000
+
+
+class ArchivoInvalido(ValueError):
+    def __init__(self, nombre, reporte):
+        self.nombre = nombre
+        self.reporte = reporte
+        super().__init__(f"{reporte['archivo']}: " + '; '.join(reporte['errores']))
+
+
+def validar(nombre, columnas, df):
+    esquema = ingesta.ESQUEMAS[nombre]
+    reglas = esquema.get('validacion', {})
+    requeridas = reglas.get('requeridas', [])
+    errores = []
+    advertencias = []
+
+    faltantes = [col for col in requeridas if col not in df.columns]
+    if faltantes:
+        errores.append(f"faltan columnas obligatorias: {', '.join(faltantes)}")
+    if len(df) == 0:
+        errores.append("el libro no tiene filas con datos")
+    ausentes = [col for col in esquema['columnas'] if col not in df.columns and col not in requeridas]
+
+    filas = []
+    for col, tipo in esquema['columnas'].items():
+        if col not in df.columns:
+            continue
+        crudo = pd.Series(columnas[col], dtype='object')
+        vacio = crudo.isna().to_numpy() | (crudo == '').to_numpy()
+        ref = (crudo == MARCA_REF).to_numpy()
+        nulo = df[col].isna().to_numpy()
+        # En las columnas tipadas, un nulo que no venía vacío es un valor que no se pudo convertir
+        invalidos = 0
+        if tipo != ingesta.TEXTO:
+            invalidos = int((nulo & ~vacio & ~ref).sum())
+        filas.append({
+            'Columna': col,
+            'Tipo': tipo,
+            'Nulos': int(nulo.sum()),
+            'Ref': int(ref.sum()),
+            'Tipo_invalido': invalidos,
+        })
+        if col in requeridas and len(df) and (nulo | ref).all():
+            errores.append(f"la columna {col} no tiene datos")
+    por_columna = pd.DataFrame(filas, columns=['Columna', 'Tipo', 'Nulos', 'Ref', 'Tipo_invalido'])
+
+    filas = []
+    for col in reglas.get('montos', []):
+        if col not in df.columns:
+            continue
+        if montos.es_moneda(col):
+            valores = montos.pesos(df[col])
+        else:
+            valores = df[col].to_numpy(dtype='float64', na_value=float('nan'))
+        filas.append({
+            'Columna': col,
+            'Negativos': int((valores < 0).sum()),
+            'Fuera_de_rango': int((valores > TOPE_MONTO).sum()),
+        })
+    por_monto = pd.DataFrame(filas, columns=['Columna', 'Negativos', 'Fuera_de_rango'])
+
+    if ausentes:
+        advertencias.append(f"columnas no encontradas: {', '.join(ausentes)}")
+    for _, fila in por_columna.iterrows():
+        if fila['Ref']:
+            advertencias.append(f"{fila['Columna']}: {fila['Ref']} celdas con {MARCA_REF}")
+        if fila['Tipo_invalido']:
+            advertencias.append(f"{fila['Columna']}: {fila['Tipo_invalido']} valores que no son de tipo {fila['Tipo']}")
+    for _, fila in por_monto.iterrows():
+        if fila['Negativos']:
+            advertencias.append(f"{fila['Columna']}: {fila['Negativos']} montos negativos")
+        if fila['Fuera_de_rango']:
+            advertencias.append(f"{fila['Columna']}: {fila['Fuera_de_rango']} montos mayores a {TOPE_MONTO:,}")
+
+    return {
+        'fuente': nombre,
+        'archivo': esquema['archivo'],
+        'filas': len(df),
+        'errores': errores,
+        'advertencias': advertencias,
+        'ausentes': ausentes,
+        'columnas': por_columna,
+        'montos': por_monto,
+    }
+
+
+def _reporte_ilegible(nombre, error):
+    return {
+        'fuente': nombre,
+        'archivo': ingesta.ESQUEMAS[nombre]['archivo'],
+        'filas': 0,
+        'errores': [f"no se pudo leer el libro ({type(error).__name__}: {error})"],
+        'advertencias': [],
+        'ausentes': [],
+        'columnas': pd.DataFrame(columns=['Columna', 'Tipo', 'Nulos', 'Ref', 'Tipo_invalido']),
+        'montos': pd.DataFrame(columns=['Columna', 'Negativos', 'Fuera_de_rango']),
+    }
+
+
+# Lee y valida un libro (ruta o bytes). Devuelve (df, reporte) o lanza
+# ArchivoInvalido con el reporte adjunto.
+def leer(nombre, origen):
+    if isinstance(origen, (bytes, bytearray)):
+        origen = io.BytesIO(origen)
+    esquema = ingesta.ESQUEMAS[nombre]
+    try:
+        columnas = ingesta.leer_columnas(origen, esquema)
+        df = ingesta.tipar(columnas, esquema)
+    except OSError:
+        # Archivo ausente o bloqueado: no es un problema del contenido
+        raise
+    except Exception as e:
+        # Libro corrupto o copiado a medias: se rechaza como cualquier libro inválido
+        raise ArchivoInvalido(nombre, _reporte_ilegible(nombre, e)) from e
+    reporte = validar(nombre, columnas, df)
+    if reporte['errores']:
+        raise ArchivoInvalido(nombre, reporte)
+    return df, reporte
@@ -0,0 +1,144 @@
+# Catálogo de fuentes en memoria.
+# Guarda la última versión ingerida de cada libro y un hilo en segundo plano
+# revisa el directorio de datos: cuando un archivo cambia se vuelve a ingerir
+# sólo esa fuente, se reemplaza la versión de forma atómica y se avisa a los
+# cachés que dependen de ella. Cada libro se valida al ingerirlo: el reporte
+# de calidad queda asociado a la versión y un libro con errores se rechaza
+# sin reemplazar la versión vigente.
+import os
+import threading
+
+import calidad
+import ingesta
+
+
+class Catalogo:
+    def __init__(self, directorio='.', intervalo=5):
+        self.directorio = directorio
+        self.intervalo = intervalo
+        self._datos = {}        # nombre -> (version, DataFrame)
+        self._calidad = {}      # nombre -> reporte de calidad de la versión vigente
+        self._rechazos = {}     # nombre -> (firma, ArchivoInvalido) del último libro rechazado
+        self._pendientes = {}   # nombre -> firma vista en la revisión anterior
+        self._oyentes = {}      # nombre -> [callback(nombre, version)]
+        self._locks = {nombre: threading.Lock() for nombre in ingesta.ESQUEMAS}
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._detener = threading.Event()
+
+    def ruta(self, nombre):
+        return os.path.join(self.directorio, ingesta.ESQUEMAS[nombre]['archivo'])
+
+    # La firma identifica el contenido publicado sin leerlo: fecha de
+    # modificación y tamaño del archivo.
+    def firma(self, nombre):
+        info = os.stat(self.ruta(nombre))
+        return f"{info.st_mtime_ns:x}-{info.st_size:x}"
+
+    # Devuelve (version, df). La primera vez se ingiere de forma sincrónica;
+    # luego siempre se sirve la versión vigente sin tocar el disco.
+    def obtener(self, nombre):
+        actual = self._datos.get(nombre)
+        if actual is not None:
+            return actual
+        with self._locks[nombre]:
+            actual = self._datos.get(nombre)
+            if actual is None:
+                firma = self.firma(nombre)
+                rechazo = self._rechazos.get(nombre)
+                if rechazo is not None and rechazo[0] == firma:
+                    # Mismo libro ya rechazado: no se vuelve a leer
+                    raise rechazo[1]
+                actual = self._ingerir(nombre, firma)
+        return actual
+
+    def version(self, nombre):
+        return self.obtener(nombre)[0]
+
+    # Reporte de calidad calculado al ingerir la versión vigente.
+    def calidad(self, nombre):
+        self.obtener(nombre)
+        return self._calidad[nombre]
+
+    # Último libro rechazado de la fuente, si todavía está publicado en disco.
+    def rechazo(self, nombre):
+        rechazo = self._rechazos.get(nombre)
+        return rechazo[1] if rechazo is not None else None
+
+    # Registra una función a llamar cuando cambia la versión de una fuente,
+    # para descartar índices o resultados derivados de la versión anterior.
+    def suscribir(self, nombre, callback):
+        with self._lock:
+            self._oyentes.setdefault(nombre, []).append(callback)
+
+    def _ingerir(self, nombre, firma):
+        try:
+            df, reporte = calidad.leer(nombre, self.ruta(nombre))
+        except calidad.ArchivoInvalido as e:
+            self._rechazos[nombre] = (firma, e)
+            raise
+        self._rechazos.pop(nombre, None)
+        nuevo = (firma, df)
+        self._calidad[nombre] = reporte
+        self._datos[nombre] = nuevo
+        with self._lock:
+            oyentes = list(self._oyentes.get(nombre, []))
+        for callback in oyentes:
+            try:
+                callback(nombre, firma)
+            except Exception:
+                pass
+        return nuevo
+
+    # Revisa las fuentes ya cargadas. Un archivo se vuelve a ingerir recién
+    # cuando su firma se mantiene entre dos revisiones, para no leer un libro
+    # que todavía se está copiando.
+    def revisar(self):
+        cambiadas = []
+        for nombre in list(self._datos):
+            try:
+                firma = self.firma(nombre)
+            except FileNotFoundError:
+                continue
+            if firma == self._datos[nombre][0]:
+                self._pendientes.pop(nombre, None)
+                self._rechazos.pop(nombre, None)
+                continue
+            rechazo = self._rechazos.get(nombre)
+            if rechazo is not None and rechazo[0] == firma:
+                # Ya se validó este mismo libro y se rechazó
+                continue
+            if self._pendientes.get(nombre) != firma:
+                self._pendientes[nombre] = firma
+                continue
+            with self._locks[nombre]:
+                try:
+                    self._ingerir(nombre, firma)
+                except calidad.ArchivoInvalido:
+                    # No pasó la validación: se conserva la versión anterior
+                    self._pendientes.pop(nombre, None)
+                    continue
+                except Exception:
+                    # Libro ilegible: se conserva la versión anterior y se reintenta
+                    continue
+            self._pendientes.pop(nombre, None)
+            cambiadas.append(nombre)
+        return cambiadas
+
+    def _vigilar(self):
+        for nombre in ingesta.ESQUEMAS:
+            try:
+                self.obtener(nombre)
+            except Exception:
+                pass
+        while not self._detener.wait(self.intervalo):
+            self.revisar()
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._vigilar, name='catalogo-vigilancia', daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
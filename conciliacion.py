@@ -0,0 +1,87 @@
+# Conciliación entre sueldos.xlsx (Sueldos Todos) y SUELDOS PARA INFORMES.xlsx
+# (Sueldos FC). Ambas fuentes se reducen a una fila por persona con una clave
+# normalizada (apellido y nombre sin acentos, en minúsculas y con espacios
+# simples) y se cruzan con un único hash join. Los importes se suman y se
+# restan en centavos; los resultados se devuelven en pesos.
+import numpy as np
+import pandas as pd
+
+import montos
+from busqueda import normalizar
+
+# (concepto, columna en Sueldos FC, columna en Sueldos Todos)
+CONCEPTOS = [
+    ('Bruto', 'Total_sueldo_bruto', 'total_sueldo_bruto'),
+    ('Neto', 'Neto', 'neto'),
+    ('Costo_laboral', 'Costo_laboral', 'total_costo_laboral'),
+]
+
+
+def clave_persona(apellido, nombre):
+    completo = apellido.fillna('').astype(str) + ' ' + nombre.fillna('').astype(str)
+    # Se normaliza cada nombre distinto una sola vez
+    distintos = pd.unique(completo)
+    normalizados = dict(zip(distintos, map(normalizar, distintos)))
+    return completo.map(normalizados)
+
+
+def _por_persona(df, apellido, nombre, columnas, sufijo):
+    claves = clave_persona(df[apellido], df[nombre])
+    reducido = pd.DataFrame({'clave': claves, 'Apellido_y_Nombre': df[apellido].astype(str).str.strip() + ' ' + df[nombre].astype(str).str.strip()})
+    for col in columnas:
+        reducido[col] = df[col].array
+    reducido = reducido[reducido['clave'] != '']
+    agregado = reducido.groupby('clave', sort=False).agg(
+        Apellido_y_Nombre=('Apellido_y_Nombre', 'first'),
+        Filas=('Apellido_y_Nombre', 'size'),
+        **{col: (col, 'sum') for col in columnas}
+    )
+    return agregado.add_suffix(sufijo)
+
+
+# Devuelve un dict con 'diferencias', 'solo_fc', 'solo_todos' y 'resumen'.
+# Un concepto difiere cuando la diferencia absoluta supera `tolerancia` pesos.
+def conciliar(df_fc, df_todos, tolerancia=1.0):
+    conceptos = [(c, fc, todos) for c, fc, todos in CONCEPTOS if fc in df_fc.columns and todos in df_todos.columns]
+    fc = _por_persona(df_fc, 'Personaapellido', 'Personanombre', [c[1] for c in conceptos], '_fc')
+    todos = _por_persona(df_todos, 'personaapellido', 'personanombre', [c[2] for c in conceptos], '_todos')
+
+    cruce = fc.join(todos, how='outer')
+    en_fc = cruce['Filas_fc'].notna().to_numpy()
+    en_todos = cruce['Filas_todos'].notna().to_numpy()
+    nombre = cruce['Apellido_y_Nombre_fc'].fillna(cruce['Apellido_y_Nombre_todos'])
+
+    ambos = cruce[en_fc & en_todos]
+    diferencias = pd.DataFrame({'Apellido_y_Nombre': nombre[en_fc & en_todos]})
+    difiere = np.zeros(len(ambos), dtype=bool)
+    for concepto, col_fc, col_todos in conceptos:
+        centavos_fc = ambos[f'{col_fc}_fc'].array
+        centavos_todos = ambos[f'{col_todos}_todos'].array
+        diferencia = montos.pesos(centavos_fc - centavos_todos)
+        diferencias[f'{concepto}_FC'] = montos.pesos(centavos_fc)
+        diferencias[f'{concepto}_Todos'] = montos.pesos(centavos_todos)
+        diferencias[f'{concepto}_Diferencia'] = diferencia
+        difiere |= np.abs(np.nan_to_num(diferencia)) > tolerancia
+    diferencias = diferencias[difiere].reset_index(drop=True)
+
+    solo_fc = cruce.loc[en_fc & ~en_todos, ['Apellido_y_Nombre_fc'] + [f'{c[1]}_fc' for c in conceptos]].copy()
+    solo_todos = cruce.loc[~en_fc & en_todos, ['Apellido_y_Nombre_todos'] + [f'{c[2]}_todos' for c in conceptos]].copy()
+    for col in solo_fc.columns[1:]:
+        solo_fc[col] = montos.pesos(solo_fc[col])
+    for col in solo_todos.columns[1:]:
+        solo_todos[col] = montos.pesos(solo_todos[col])
+    resumen = {
+        'Personas_FC': int(en_fc.sum()),
+        'Personas_Todos': int(en_todos.sum()),
+        'En_ambas': int((en_fc & en_todos).sum()),
+        'Con_diferencias': len(diferencias),
+        'Solo_FC': len(solo_fc),
+        'Solo_Todos': len(solo_todos),
+        'Conceptos': [c[0] for c in conceptos],
+    }
+    return {
+        'diferencias': diferencias,
+        'solo_fc': solo_fc.reset_index(drop=True),
+        'solo_todos': solo_todos.reset_index(drop=True),
+        'resumen': resumen,
+    }
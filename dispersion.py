@@ -0,0 +1,87 @@
+# Dispersión salarial por grupo.
+# Ordena una sola vez las filas por (grupo, sueldo) y a partir de ese orden
+# calcula para todos los grupos a la vez percentiles, rango intercuartil,
+# coeficiente de variación y Gini, y marca como atípicas las personas fuera de
+# [P25 - 1.5 IQR, P75 + 1.5 IQR] de su grupo.
+import numpy as np
+import pandas as pd
+
+import montos
+
+PERCENTILES = [10, 25, 50, 75, 90]
+FACTOR_IQR = 1.5
+# Un grupo se considera de alta dispersión por encima de este coeficiente de variación (%)
+UMBRAL_CV = 25.0
+
+
+def _codigos_grupo(df, grupos):
+    codigos = np.zeros(len(df), dtype=np.int64)
+    valido = np.ones(len(df), dtype=bool)
+    for col in grupos:
+        codigo, valores = pd.factorize(df[col].replace(['#Ref', ''], np.nan), sort=True)
+        valido &= codigo >= 0
+        codigos = codigos * (len(valores) + 1) + codigo
+    return codigos, valido
+
+
+# Devuelve (por_grupo, atipicos). `atipicos` conserva el índice original de
+# `df` para poder cruzarlo con una selección filtrada.
+def analizar(df, grupos=('Puesto_tabla_salarial', 'seniority'), valor='Total_sueldo_bruto'):
+    grupos = list(grupos)
+    if montos.es_moneda(valor):
+        sueldos = montos.pesos(df[valor])
+    else:
+        sueldos = df[valor].to_numpy(dtype='float64', na_value=np.nan)
+    codigos, valido = _codigos_grupo(df, grupos)
+    valido &= ~np.isnan(sueldos)
+    filas = np.flatnonzero(valido)
+    if len(filas) == 0:
+        return pd.DataFrame(), df.iloc[0:0]
+
+    _, grupo = np.unique(codigos[filas], return_inverse=True)
+    orden = np.lexsort((sueldos[filas], grupo))
+    filas = filas[orden]
+    grupo = grupo[orden]
+    x = sueldos[filas]
+
+    cantidad = np.bincount(grupo)
+    inicio = np.concatenate(([0], np.cumsum(cantidad)[:-1]))
+
+    def percentil(p):
+        posicion = (cantidad - 1) * (p / 100)
+        abajo = np.floor(posicion).astype(np.int64)
+        arriba = np.minimum(abajo + 1, cantidad - 1)
+        fraccion = posicion - abajo
+        return x[inicio + abajo] + (x[inicio + arriba] - x[inicio + abajo]) * fraccion
+
+    valores_p = {p: percentil(p) for p in PERCENTILES}
+    suma = np.bincount(grupo, weights=x)
+    media = suma / cantidad
+    desvio = np.sqrt(np.bincount(grupo, weights=np.square(x - media[grupo])) / np.maximum(cantidad - 1, 1))
+    rango = np.arange(len(x)) - inicio[grupo] + 1
+    gini = np.divide(2 * np.bincount(grupo, weights=rango * x), cantidad * suma,
+                     out=np.zeros(len(cantidad)), where=suma != 0) - (cantidad + 1) / cantidad
+    iqr = valores_p[75] - valores_p[25]
+    limite_inferior = valores_p[25] - FACTOR_IQR * iqr
+    limite_superior = valores_p[75] + FACTOR_IQR * iqr
+    es_atipico = (x < limite_inferior[grupo]) | (x > limite_superior[grupo])
+
+    primera = df.iloc[filas[inicio]]
+    por_grupo = pd.DataFrame({col: primera[col].to_numpy() for col in grupos})
+    por_grupo['Cantidad'] = cantidad
+    por_grupo['Promedio'] = media
+    for p in PERCENTILES:
+        por_grupo[f'P{p}'] = valores_p[p]
+    por_grupo['IQR'] = iqr
+    por_grupo['CV_%'] = np.divide(desvio, media, out=np.zeros(len(media)), where=media != 0) * 100
+    por_grupo['Gini'] = np.where(cantidad > 1, gini, 0.0)
+    por_grupo['Atipicos'] = np.bincount(grupo, weights=es_atipico).astype(np.int64)
+    por_grupo['Alta_dispersion'] = (por_grupo['CV_%'] > UMBRAL_CV) & (cantidad > 1)
+    por_grupo = por_grupo.sort_values('CV_%', ascending=False, ignore_index=True)
+
+    marcadas = filas[es_atipico]
+    atipicos = montos.en_pesos(df.iloc[marcadas])
+    atipicos['Limite_inferior'] = limite_inferior[grupo[es_atipico]]
+    atipicos['Limite_superior'] = limite_superior[grupo[es_atipico]]
+    atipicos['Mediana_grupo'] = valores_p[50][grupo[es_atipico]]
+    return por_grupo, atipicos
@@ -0,0 +1,199 @@
+# Simulador de aumentos salariales sobre el personal fuera de convenio.
+# Cada regla aplica un porcentaje a un grupo (Gerencia, Puesto tabla salarial
+# o tramo de banda) con un piso y un tope opcionales sobre el monto del
+# aumento; los aumentos de varias reglas se suman. Los grupos se indexan una
+# sola vez, así que agregar, quitar o editar una regla sólo toca las filas de
+# su grupo y actualiza los totales, las bandas y la dispersión de forma
+# incremental.
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import ingesta
+import montos
+from analitica import CATEGORIAS_BANDA
+
+CRITERIOS = ['Gerencia', 'Puesto_tabla_salarial', 'Banda']
+CORTES_BANDA = [0.25, 0.50, 0.75]
+
+
+def categoria_banda(banda):
+    categorias = np.searchsorted(CORTES_BANDA, banda, side='right')
+    return np.where(np.isnan(banda), -1, categorias)
+
+
+# Convierte una fila de reglas (dict) a su clave inmutable, o None si está incompleta.
+def normalizar_regla(regla):
+    criterio = regla.get('criterio')
+    valor = regla.get('valor')
+    porcentaje = regla.get('porcentaje')
+    if criterio not in CRITERIOS or valor is None or pd.isna(valor) or porcentaje is None or pd.isna(porcentaje):
+        return None
+    piso = regla.get('piso')
+    tope = regla.get('tope')
+    return (
+        criterio,
+        str(valor),
+        float(porcentaje),
+        None if piso is None or pd.isna(piso) else float(piso),
+        None if tope is None or pd.isna(tope) else float(tope),
+    )
+
+
+class Simulador:
+    def __init__(self, df):
+        n = len(df)
+        self.base = np.nan_to_num(montos.pesos(df['Total_sueldo_bruto']))
+        costo = np.nan_to_num(montos.pesos(df['Costo_laboral'])) if 'Costo_laboral' in df.columns else np.zeros(n)
+        # Totales de partida exactos, sumados en centavos
+        self.total_base = montos.suma(df['Total_sueldo_bruto'])
+        # El costo laboral acompaña al bruto en la misma proporción que hoy
+        self._costo_por_peso = np.divide(costo, self.base, out=np.zeros(n), where=self.base != 0)
+
+        if 'Porcentaje_Banda_Salarial' in df.columns:
+            self.banda_base = ingesta.normalizar_banda(df['Porcentaje_Banda_Salarial']).to_numpy(dtype='float64')
+        else:
+            self.banda_base = np.full(n, np.nan)
+        if 'Minimo' in df.columns and 'Maximo' in df.columns:
+            self._rango = (df['Maximo'] - df['Minimo']).to_numpy(dtype='float64')
+        else:
+            self._rango = np.full(n, np.nan)
+        self._rango = np.where(self._rango > 0, self._rango, np.nan)
+
+        # Índice de filas por grupo: posiciones ordenadas por código y cortes
+        self.codigos = {}
+        self.valores = {}
+        self._orden = {}
+        self._cortes = {}
+        for criterio in CRITERIOS:
+            if criterio == 'Banda':
+                codigos = categoria_banda(self.banda_base)
+                valores = pd.Index(CATEGORIAS_BANDA)
+            elif criterio in df.columns:
+                codigos, valores = pd.factorize(df[criterio].replace('', np.nan), sort=True)
+            else:
+                codigos, valores = np.full(n, -1), pd.Index([])
+            orden = np.argsort(codigos, kind='stable')
+            self.codigos[criterio] = codigos
+            self.valores[criterio] = valores
+            self._orden[criterio] = orden
+            self._cortes[criterio] = np.searchsorted(codigos[orden], np.arange(len(valores) + 1))
+
+        self.aumento = np.zeros(n)
+        self.nuevo = self.base.copy()
+        self.banda = self.banda_base.copy()
+        self.categoria = categoria_banda(self.banda)
+        self._reglas = Counter()
+        self._contribuciones = {}
+        self.filas_recalculadas = 0
+
+        self._suma = self.total_base
+        self._suma_cuadrados = np.square(self.base).sum()
+        self._costo = (self._costo_por_peso * self.base).sum()
+        self._conteo_bandas = np.bincount(self.categoria[self.categoria >= 0], minlength=len(CATEGORIAS_BANDA))
+        self._sumas_grupo = {
+            criterio: np.bincount(self.codigos[criterio][self.codigos[criterio] >= 0],
+                                  weights=self.base[self.codigos[criterio] >= 0],
+                                  minlength=len(self.valores[criterio]))
+            for criterio in CRITERIOS
+        }
+        self._sumas_grupo_base = {criterio: sumas.copy() for criterio, sumas in self._sumas_grupo.items()}
+        self._cantidad_grupo = {
+            criterio: np.bincount(self.codigos[criterio][self.codigos[criterio] >= 0], minlength=len(self.valores[criterio]))
+            for criterio in CRITERIOS
+        }
+
+    def filas_de(self, criterio, valor):
+        codigo = self.valores[criterio].get_indexer([valor])[0]
+        if codigo < 0:
+            return np.array([], dtype=np.intp)
+        cortes = self._cortes[criterio]
+        return self._orden[criterio][cortes[codigo]:cortes[codigo + 1]]
+
+    # Filas y aumento de una regla sobre el sueldo actual, sin aplicarla.
+    def _contribucion(self, regla):
+        if regla not in self._contribuciones:
+            criterio, valor, porcentaje, piso, tope = regla
+            filas = self.filas_de(criterio, valor)
+            monto = self.base[filas] * (porcentaje / 100)
+            if piso is not None or tope is not None:
+                monto = np.clip(monto, piso, tope)
+            self._contribuciones[regla] = (filas, monto)
+        return self._contribuciones[regla]
+
+    def _sumar(self, filas, delta):
+        if len(filas) == 0:
+            return
+        anterior = self.nuevo[filas]
+        nuevo = anterior + delta
+        self._suma += delta.sum()
+        self._suma_cuadrados += (np.square(nuevo) - np.square(anterior)).sum()
+        self._costo += (self._costo_por_peso[filas] * delta).sum()
+
+        categoria_anterior = self.categoria[filas]
+        banda = self.banda[filas] + delta / self._rango[filas]
+        banda = np.where(np.isnan(banda), self.banda[filas], banda)
+        categoria = categoria_banda(banda)
+        self._conteo_bandas -= np.bincount(categoria_anterior[categoria_anterior >= 0], minlength=len(CATEGORIAS_BANDA))
+        self._conteo_bandas += np.bincount(categoria[categoria >= 0], minlength=len(CATEGORIAS_BANDA))
+
+        for criterio, sumas in self._sumas_grupo.items():
+            codigos = self.codigos[criterio][filas]
+            validos = codigos >= 0
+            np.add.at(sumas, codigos[validos], delta[validos])
+
+        self.aumento[filas] += delta
+        self.nuevo[filas] = nuevo
+        self.banda[filas] = banda
+        self.categoria[filas] = categoria
+        self.filas_recalculadas += len(filas)
+
+    # Lleva el simulador al conjunto de reglas pedido aplicando sólo la
+    # diferencia con el conjunto anterior.
+    def aplicar(self, reglas):
+        objetivo = Counter(regla for regla in map(normalizar_regla, reglas) if regla is not None)
+        for regla in set(self._reglas) | set(objetivo):
+            veces = objetivo[regla] - self._reglas[regla]
+            if veces:
+                filas, monto = self._contribucion(regla)
+                self._sumar(filas, monto * veces)
+        self._reglas = objetivo
+        for regla in set(self._contribuciones) - set(objetivo):
+            del self._contribuciones[regla]
+        return self
+
+    def resumen(self):
+        n = len(self.base)
+        total_base = self.total_base
+        promedio = self._suma / n if n else 0
+        varianza = max(self._suma_cuadrados / n - promedio ** 2, 0) if n else 0
+        minimo = self.nuevo.min() if n else 0
+        maximo = self.nuevo.max() if n else 0
+        con_banda = self._conteo_bandas.sum()
+        return {
+            'Total_personas': n,
+            'Total_bruto_actual': total_base,
+            'Total_bruto_simulado': self._suma,
+            'Aumento_total': self._suma - total_base,
+            'Aumento_%': (self._suma / total_base - 1) * 100 if total_base else 0,
+            'Costo_laboral_simulado': self._costo,
+            'Sueldo_promedio': promedio,
+            'Sueldo_minimo': minimo,
+            'Sueldo_maximo': maximo,
+            'Dispersion_%': (maximo - minimo) / minimo * 100 if minimo > 0 else 0,
+            'Coeficiente_variacion_%': np.sqrt(varianza) / promedio * 100 if promedio else 0,
+            'Bandas_%': dict(zip(CATEGORIAS_BANDA, self._conteo_bandas / con_banda * 100 if con_banda else self._conteo_bandas * 0.0)),
+        }
+
+    def por_grupo(self, criterio):
+        valores = self.valores[criterio]
+        actual = self._sumas_grupo_base[criterio]
+        simulado = self._sumas_grupo[criterio]
+        return pd.DataFrame({
+            criterio: valores.astype(str),
+            'Cantidad': self._cantidad_grupo[criterio],
+            'Total_actual': actual,
+            'Total_simulado': simulado,
+            'Aumento_%': np.divide(simulado - actual, actual, out=np.zeros(len(valores)), where=actual != 0) * 100,
+        })
@@ -0,0 +1,70 @@
+# Perfil de columnas e índices para los filtros del sidebar.
+# El perfil decide qué widget usar según el tipo y la cardinalidad de cada
+# columna y deja listos los índices para filtrar sin recorrer la tabla.
+import bisect
+
+import numpy as np
+import pandas as pd
+
+# Hasta esta cantidad de valores distintos una columna de texto se filtra con
+# multiselect; por encima se usa un buscador por prefijo.
+LIMITE_OPCIONES = 50
+
+
+class IndiceFechas:
+    # Fechas válidas ordenadas junto con la fila de origen de cada una.
+    def __init__(self, serie):
+        valores = serie.to_numpy(dtype='datetime64[ns]')
+        validas = np.flatnonzero(~np.isnat(valores))
+        orden = np.argsort(valores[validas], kind='stable')
+        self.filas = validas[orden]
+        self.valores = valores[self.filas]
+
+    def __len__(self):
+        return len(self.valores)
+
+    def minimo(self):
+        return pd.Timestamp(self.valores[0]).date()
+
+    def maximo(self):
+        return pd.Timestamp(self.valores[-1]).date()
+
+    # Filas con fecha en [desde, hasta], ambos días incluidos, por búsqueda binaria.
+    def filas_entre(self, desde, hasta):
+        inicio = np.searchsorted(self.valores, np.datetime64(desde, 'ns'), side='left')
+        fin = np.searchsorted(self.valores, np.datetime64(hasta, 'ns') + np.timedelta64(1, 'D'), side='left')
+        return self.filas[inicio:fin]
+
+
+class IndicePrefijos:
+    # Valores distintos ordenados por su forma en minúsculas.
+    def __init__(self, valores):
+        pares = sorted((str(v).lower(), v) for v in valores)
+        self.claves = [clave for clave, _ in pares]
+        self.valores = [valor for _, valor in pares]
+
+    def __len__(self):
+        return len(self.valores)
+
+    def buscar(self, prefijo):
+        prefijo = prefijo.strip().lower()
+        inicio = bisect.bisect_left(self.claves, prefijo)
+        fin = bisect.bisect_left(self.claves, prefijo + '\uffff')
+        return self.valores[inicio:fin]
+
+
+# Devuelve {columna: {'tipo': 'opciones' | 'busqueda' | 'fecha', ...}} para
+# las columnas de texto y de fecha de `df`. Los valores vacíos no se ofrecen.
+def perfilar(df, limite=LIMITE_OPCIONES):
+    perfil = {}
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            perfil[col] = {'tipo': 'fecha', 'indice': IndiceFechas(serie)}
+        elif serie.dtype == 'object':
+            valores = pd.unique(serie[serie != ''])
+            if len(valores) <= limite:
+                perfil[col] = {'tipo': 'opciones', 'valores': sorted(valores, key=str)}
+            else:
+                perfil[col] = {'tipo': 'busqueda', 'indice': IndicePrefijos(valores)}
+    return perfil
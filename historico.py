@@ -0,0 +1,197 @@
+# Histórico de liquidaciones.
+# Cada libro mensual se ingiere una sola vez a una partición por período
+# (historico/<fuente>/periodo=AAAA-MM/<hash>.parquet). Las particiones no se
+# modifican: si un período se vuelve a publicar con otro contenido se agrega
+# una parte nueva y el manifiesto apunta a ella. Las consultas leen sólo las
+# particiones y columnas que necesitan.
+import hashlib
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+
+import calidad
+import ingesta
+import montos
+
+FUENTES = {
+    'sueldos_todos': {
+        'persona': 'apellido_nombre',
+        'grupos': ['empresa', 'es_cvh', 'comitente'],
+        'valores': ['total_sueldo_bruto', 'neto', 'total_costo_laboral'],
+    },
+    'sueldos_fc': {
+        'persona': 'Apellido_y_Nombre',
+        'grupos': [
+            'Empresa', 'CCT', 'Grupo', 'Comitente', 'Puesto', 'seniority', 'Gerencia', 'CVH',
+            'Puesto_tabla_salarial', 'Locacion', 'Centro_de_Costos', 'Especialidad'
+        ],
+        'valores': ['Total_sueldo_bruto', 'Costo_laboral', 'Porcentaje_Banda_Salarial'],
+    },
+}
+
+_lock = threading.Lock()
+
+
+def _normalizar_periodo(valor):
+    coincidencia = re.match(r'^\s*(\d{4})\D?(\d{1,2})', str(valor))
+    if coincidencia is None:
+        return None
+    return f"{coincidencia.group(1)}-{int(coincidencia.group(2)):02d}"
+
+
+# El período sale de la columna `periodo` cuando el libro la trae. Los libros
+# sin esa columna (Sueldos FC) no se archivan solos: la fecha del archivo no
+# dice a qué mes corresponde la liquidación y hay que indicarlo al subirlo.
+def periodo_de(df):
+    if 'periodo' in df.columns:
+        periodos = df['periodo'].dropna().map(_normalizar_periodo).dropna()
+        if len(periodos) > 0:
+            return periodos.mode().iloc[0]
+    return None
+
+
+class Historico:
+    def __init__(self, directorio='historico'):
+        self.directorio = directorio
+        self._manifiesto_ruta = os.path.join(directorio, 'manifiesto.json')
+        # fuente -> mensaje del último archivado automático que falló
+        self.errores = {}
+
+    def _leer_manifiesto(self):
+        try:
+            with open(self._manifiesto_ruta, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'ingeridos': {}, 'particiones': {}}
+
+    def _guardar_manifiesto(self, manifiesto):
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = self._manifiesto_ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(manifiesto, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temporal, self._manifiesto_ruta)
+
+    # Token que cambia sólo cuando se agrega o reemplaza alguna partición;
+    # sirve de clave para cachear las comparaciones.
+    def version(self):
+        particiones = self._leer_manifiesto()['particiones']
+        return hashlib.sha1(json.dumps(particiones, sort_keys=True).encode()).hexdigest()[:12]
+
+    def periodos(self, fuente):
+        return sorted(self._leer_manifiesto()['particiones'].get(fuente, {}))
+
+    # Ingiere un libro ya leído. Devuelve el período registrado o None si ese
+    # mismo contenido ya estaba en el histórico. Con `corregir` un libro ya
+    # archivado en otro período de la misma fuente se mueve al indicado.
+    def registrar(self, fuente, df, contenido, periodo, corregir=False):
+        huella = hashlib.sha1(contenido).hexdigest()
+        periodo = _normalizar_periodo(periodo)
+        if periodo is None:
+            raise ValueError("No se pudo determinar el período del archivo; indicalo como AAAA-MM")
+        config = FUENTES[fuente]
+        columnas = [config['persona']] + config['grupos'] + config['valores']
+        compacto = df[[col for col in columnas if col in df.columns]].copy()
+        for col in config['grupos'] + [config['persona']]:
+            if col in compacto.columns:
+                compacto[col] = compacto[col].astype(str).replace(['#Ref', 'nan', ''], 'Sin dato').astype('category')
+        if 'Porcentaje_Banda_Salarial' in compacto.columns:
+            compacto['Porcentaje_Banda_Salarial'] = ingesta.normalizar_banda(compacto['Porcentaje_Banda_Salarial'])
+        # Las particiones guardan los importes en pesos, igual que las ya archivadas
+        compacto = montos.en_pesos(compacto)
+
+        with _lock:
+            manifiesto = self._leer_manifiesto()
+            previo = manifiesto['ingeridos'].get(huella)
+            if previo is not None:
+                if not corregir or previo['fuente'] != fuente or previo['periodo'] == periodo:
+                    return None
+                particiones = manifiesto['particiones'].get(fuente, {})
+                anterior = os.path.join(fuente, f"periodo={previo['periodo']}", f"{huella[:16]}.parquet")
+                if particiones.get(previo['periodo']) == anterior:
+                    del particiones[previo['periodo']]
+                    if os.path.exists(os.path.join(self.directorio, anterior)):
+                        os.remove(os.path.join(self.directorio, anterior))
+            carpeta = os.path.join(self.directorio, fuente, f"periodo={periodo}")
+            os.makedirs(carpeta, exist_ok=True)
+            archivo = os.path.join(carpeta, f"{huella[:16]}.parquet")
+            compacto.to_parquet(archivo, index=False)
+            manifiesto['ingeridos'][huella] = {'fuente': fuente, 'periodo': periodo}
+            manifiesto['particiones'].setdefault(fuente, {})[periodo] = os.path.relpath(archivo, self.directorio)
+            self._guardar_manifiesto(manifiesto)
+        return periodo
+
+    def ya_ingerido(self, contenido):
+        return hashlib.sha1(contenido).hexdigest() in self._leer_manifiesto()['ingeridos']
+
+    # Ingiere un libro subido por el usuario; el período explícito tiene
+    # prioridad sobre el que trae el propio libro y corrige el de un libro ya
+    # archivado. Un libro que no pasa la validación lanza
+    # calidad.ArchivoInvalido y no se archiva.
+    def registrar_contenido(self, fuente, contenido, periodo=None):
+        if periodo is None and self.ya_ingerido(contenido):
+            return None
+        df, _ = calidad.leer(fuente, contenido)
+        return self.registrar(fuente, df, contenido, periodo or periodo_de(df), corregir=periodo is not None)
+
+    # Ingiere el libro vigente de una fuente. Si ya se leyó (por ejemplo, desde
+    # el catálogo) se pasa `df` para no volver a parsearlo. Devuelve None si
+    # ya estaba archivado o si el libro no trae su período.
+    def registrar_archivo(self, fuente, ruta, df=None):
+        with open(ruta, 'rb') as f:
+            contenido = f.read()
+        if self.ya_ingerido(contenido):
+            return None
+        if df is None:
+            df, _ = calidad.leer(fuente, contenido)
+        periodo = periodo_de(df)
+        if periodo is None:
+            return None
+        return self.registrar(fuente, df, contenido, periodo)
+
+    # Lee los períodos pedidos proyectando sólo las columnas indicadas.
+    def leer(self, fuente, periodos=None, columnas=None):
+        particiones = self._leer_manifiesto()['particiones'].get(fuente, {})
+        partes = []
+        for periodo in sorted(particiones):
+            if periodos is not None and periodo not in periodos:
+                continue
+            parte = pd.read_parquet(os.path.join(self.directorio, particiones[periodo]), columns=columnas)
+            parte['periodo'] = periodo
+            partes.append(parte)
+        if not partes:
+            return pd.DataFrame(columns=(columnas or []) + ['periodo'])
+        return pd.concat(partes, ignore_index=True)
+
+
+# Promedio, dotación y posición en banda por grupo y período, con el
+# crecimiento y la variación de dotación respecto del primer período elegido.
+def comparar_periodos(historico, fuente, grupo, valor, periodos):
+    config = FUENTES[fuente]
+    columnas = [grupo, valor]
+    con_banda = 'Porcentaje_Banda_Salarial' in config['valores'] and valor != 'Porcentaje_Banda_Salarial'
+    if con_banda:
+        columnas.append('Porcentaje_Banda_Salarial')
+    df = historico.leer(fuente, periodos=periodos, columnas=columnas)
+    if df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    agregados = {'Promedio': (valor, 'mean'), 'Dotacion': (valor, 'size')}
+    if con_banda:
+        agregados['Banda_Promedio'] = ('Porcentaje_Banda_Salarial', 'mean')
+    evolucion = df.groupby([grupo, 'periodo'], observed=True).agg(**agregados).reset_index()
+    evolucion[grupo] = evolucion[grupo].astype(str)
+
+    ordenados = sorted(df['periodo'].unique())
+    inicio, fin = ordenados[0], ordenados[-1]
+    tabla = evolucion.pivot(index=grupo, columns='periodo')
+    resumen = pd.DataFrame(index=tabla.index)
+    resumen[f'Promedio_{inicio}'] = tabla[('Promedio', inicio)]
+    resumen[f'Promedio_{fin}'] = tabla[('Promedio', fin)]
+    resumen['Crecimiento_%'] = (resumen[f'Promedio_{fin}'] / resumen[f'Promedio_{inicio}'] - 1) * 100
+    resumen['Dotacion_Delta'] = tabla[('Dotacion', fin)].fillna(0) - tabla[('Dotacion', inicio)].fillna(0)
+    if con_banda:
+        resumen['Deriva_Banda_pp'] = (tabla[('Banda_Promedio', fin)] - tabla[('Banda_Promedio', inicio)]) * 100
+    return evolucion, resumen.reset_index()
@@ -0,0 +1,310 @@
+# Capa de ingesta de los libros Excel del repositorio.
+# Cada fuente declara su esquema: qué columnas se usan, con qué tipo, cómo se
+# normalizan los encabezados y qué se valida al ingerirla (ver calidad.py).
+# El lector recorre la hoja en modo sólo lectura y materializa únicamente las
+# columnas declaradas, con los tipos ya resueltos.
+import datetime
+import os
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+TEXTO = 'texto'
+NUMERO = 'numero'
+ENTERO = 'entero'
+FECHA = 'fecha'
+# Importes en pesos: se guardan como enteros de centavos (ver montos.py)
+MONEDA = 'moneda'
+
+COLUMNAS_CATEGORICAS_FC = [
+    'Empresa', 'CCT', 'Grupo', 'Comitente', 'Puesto', 'seniority', 'Gerencia', 'CVH',
+    'Puesto_tabla_salarial', 'Locacion', 'Centro_de_Costos', 'Especialidad', 'Superior',
+    'Personaapellido', 'Personanombre'
+]
+
+ESQUEMAS = {
+    'sueldos_fc': {
+        'archivo': 'SUELDOS PARA INFORMES.xlsx',
+        'minusculas': False,
+        'renombrar': {'%_BANDA_SALARIAL': 'Porcentaje_Banda_Salarial'},
+        'columnas': {
+            'Legajo': ENTERO,
+            **{col: TEXTO for col in COLUMNAS_CATEGORICAS_FC},
+            'Apellido_y_Nombre': TEXTO,
+            'Total_sueldo_bruto': MONEDA,
+            'Costo_laboral': MONEDA,
+            'Minimo': NUMERO,
+            'Media': NUMERO,
+            'Maximo': NUMERO,
+            'Porcentaje_Banda_Salarial': NUMERO,
+            'Antigüedad': NUMERO,
+            'Edad': NUMERO,
+            'Fecha_de_Ingreso': FECHA,
+            'Fecha_de_nacimiento': FECHA,
+        },
+        'validacion': {
+            'requeridas': [
+                'Personaapellido', 'Personanombre', 'Gerencia', 'Puesto_tabla_salarial', 'Grupo',
+                'seniority', 'Total_sueldo_bruto',
+            ],
+            'montos': ['Total_sueldo_bruto', 'Costo_laboral', 'Minimo', 'Media', 'Maximo'],
+        },
+    },
+    'sueldos_todos': {
+        'archivo': 'sueldos.xlsx',
+        'minusculas': True,
+        'renombrar': {'convenio': 'categoria'},
+        'columnas': {
+            'legajo': ENTERO,
+            'empresa': TEXTO,
+            'categoria': TEXTO,
+            'es_cvh': TEXTO,
+            'personaapellido': TEXTO,
+            'personanombre': TEXTO,
+            'apellido_nombre': TEXTO,
+            'periodo': TEXTO,
+            'comitente': TEXTO,
+            'total_sueldo_bruto': MONEDA,
+            'neto': MONEDA,
+            'total_costo_laboral': MONEDA,
+        },
+        'validacion': {
+            'requeridas': ['empresa', 'personaapellido', 'personanombre', 'total_sueldo_bruto'],
+            'montos': ['total_sueldo_bruto', 'neto', 'total_costo_laboral'],
+        },
+    },
+    'legajos': {
+        'archivo': 'Análisis de legajos.xlsx',
+        'minusculas': False,
+        'renombrar': {},
+        'columnas': {
+            'Codigo': ENTERO,
+            'Empresa': TEXTO,
+            'Apellido': TEXTO,
+            'Nombre': TEXTO,
+            'Fechaalta': FECHA,
+            'Edad': NUMERO,
+            'Antigüedad': NUMERO,
+            'Fechanac': FECHA,
+            'Puesto': TEXTO,
+            'Conveniocategoria': TEXTO,
+            'Locacion': TEXTO,
+            'Es_cvh': TEXTO,
+            'Un/us/uo/sec/log': TEXTO,
+            'Comitente': TEXTO,
+            'Sexo': TEXTO,
+            'Convenio': TEXTO,
+            'Centro_de_costo': TEXTO,
+            'Legajocompleto': TEXTO,
+            'Legajoobservacion': TEXTO,
+            'Usoimagen': TEXTO,
+        },
+        'validacion': {
+            'requeridas': ['Empresa', 'Apellido', 'Nombre'],
+            'montos': [],
+        },
+    },
+    'tabla_salarial': {
+        'archivo': 'tabla salarial.xlsx',
+        'minusculas': False,
+        'renombrar': {},
+        'columnas': {
+            'Puesto': TEXTO,
+            'Seniority': TEXTO,
+            'Locacion': TEXTO,
+            'Q1': NUMERO,
+            'Q2': NUMERO,
+            'Q3': NUMERO,
+            'Q4': NUMERO,
+            'Q5': NUMERO,
+        },
+        'validacion': {
+            'requeridas': ['Puesto', 'Seniority', 'Locacion', 'Q1', 'Q2', 'Q3', 'Q4', 'Q5'],
+            'montos': ['Q1', 'Q2', 'Q3', 'Q4', 'Q5'],
+        },
+    },
+    # Tablero de KPIs: la hoja no es tabular sino una serie de bloques
+    # (título, encabezado con los meses y una fila por área) que se pasan a
+    # formato largo.
+    'kpi': {
+        'archivo': 'kpi.xlsx',
+        'hoja': 'DDP',
+        'formato': 'bloques',
+        'minusculas': False,
+        'renombrar': {},
+        'columnas': {
+            'indicador': TEXTO,
+            'area': TEXTO,
+            'periodo': FECHA,
+            'valor': NUMERO,
+        },
+        'validacion': {
+            'requeridas': ['indicador', 'area', 'periodo', 'valor'],
+            'montos': [],
+        },
+    },
+}
+
+
+COLUMNAS_MONEDA = {
+    col for esquema in ESQUEMAS.values() for col, tipo in esquema['columnas'].items() if tipo == MONEDA
+}
+
+
+# Normaliza un encabezado igual que lo hacían las páginas: sin espacios en los
+# extremos, espacios internos como '_' y, según la fuente, en minúsculas.
+def normalizar_encabezado(nombre, esquema):
+    if nombre is None:
+        return None
+    nombre = str(nombre).strip().replace(' ', '_')
+    if esquema['minusculas']:
+        nombre = nombre.lower()
+    return esquema['renombrar'].get(nombre, nombre)
+
+
+def _convertir(valores, tipo):
+    if tipo == NUMERO:
+        return pd.to_numeric(pd.Series(valores, dtype='object'), errors='coerce').astype('float64')
+    if tipo == ENTERO:
+        numeros = pd.to_numeric(pd.Series(valores, dtype='object'), errors='coerce').astype('float64')
+        # Un valor no entero (1.5) o infinito queda como faltante en vez de cortar la ingesta
+        return numeros.where(np.isfinite(numeros) & (numeros == numeros.round())).astype('Int64')
+    if tipo == MONEDA:
+        centavos = (pd.to_numeric(pd.Series(valores, dtype='object'), errors='coerce').astype('float64') * 100).round()
+        return centavos.where(np.isfinite(centavos)).astype('Int64')
+    if tipo == FECHA:
+        return pd.to_datetime(pd.Series(valores, dtype='object'), errors='coerce', format='mixed')
+    serie = pd.Series(valores, dtype='object')
+    mascara = serie.notna()
+    serie[mascara] = serie[mascara].map(str)
+    # Las celdas vacías quedan como NaN, igual que con read_excel
+    return serie.where(mascara, np.nan)
+
+
+# Lee la primera hoja de `ruta` proyectando sólo las columnas del esquema.
+# Devuelve los valores tal como vienen en el libro, una lista por columna.
+def _columnas_libro(ruta, esquema):
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        hoja = libro.worksheets[0]
+        encabezado = next(hoja.iter_rows(max_row=1, values_only=True), ())
+
+        posiciones = {}
+        for i, nombre in enumerate(encabezado):
+            nombre = normalizar_encabezado(nombre, esquema)
+            if nombre in esquema['columnas'] and nombre not in posiciones:
+                posiciones[nombre] = i
+        if not posiciones:
+            return {}
+
+        # Se limita el rango de columnas para no materializar celdas ajenas al esquema
+        min_col = min(posiciones.values())
+        max_col = max(posiciones.values())
+        nombres = list(posiciones)
+        tomar = itemgetter(*[posiciones[n] - min_col for n in nombres])
+        ancho = max_col - min_col + 1
+
+        registros = []
+        for fila in hoja.iter_rows(min_row=2, min_col=min_col + 1, max_col=max_col + 1, values_only=True):
+            if len(fila) < ancho:
+                fila = tuple(fila) + (None,) * (ancho - len(fila))
+            valores = tomar(fila)
+            if len(nombres) == 1:
+                valores = (valores,)
+            if all(v is None for v in valores):
+                continue
+            registros.append(valores)
+    finally:
+        libro.close()
+
+    columnas = zip(*registros) if registros else [()] * len(nombres)
+    return {nombre: list(valores) for nombre, valores in zip(nombres, columnas)}
+
+
+def _es_fecha(valor):
+    return isinstance(valor, (datetime.date, datetime.datetime))
+
+
+# Lee una hoja armada como bloques: una fila con texto y sin números es el
+# título del indicador, una fila con fechas desde la tercera columna es el
+# encabezado de períodos, y las filas siguientes traen el área en la segunda
+# columna y un valor por período. La primera columna se ignora. Se
+# descartan los períodos sin cargar de cada indicador, es decir aquellos en
+# que todas las áreas valen 0 o están vacías.
+def _columnas_bloques(ruta, esquema):
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        hoja = libro[esquema['hoja']] if esquema.get('hoja') in libro.sheetnames else libro.worksheets[0]
+        registros = []
+        indicador = None
+        periodos = None
+        bloque = []
+        for fila in hoja.iter_rows(values_only=True):
+            etiqueta = fila[1] if len(fila) > 1 else None
+            valores = fila[2:]
+            fechas = [(i, v) for i, v in enumerate(valores) if _es_fecha(v)]
+            if fechas:
+                registros.extend(_cerrar_bloque(bloque))
+                periodos, bloque = fechas, []
+            elif isinstance(etiqueta, str) and not any(_es_numero(v) for v in _en_periodos(valores, periodos)):
+                registros.extend(_cerrar_bloque(bloque))
+                indicador, periodos, bloque = etiqueta.strip(), None, []
+            elif periodos is not None and etiqueta is not None and indicador is not None:
+                bloque.extend(
+                    (indicador, str(etiqueta).strip(), fecha, valores[i] if i < len(valores) else None)
+                    for i, fecha in periodos
+                )
+        registros.extend(_cerrar_bloque(bloque))
+    finally:
+        libro.close()
+
+    columnas = zip(*registros) if registros else [()] * len(esquema['columnas'])
+    return {nombre: list(valores) for nombre, valores in zip(esquema['columnas'], columnas)}
+
+
+# Sólo cuentan las celdas bajo los meses del encabezado vigente; al costado de
+# la hoja hay cálculos sueltos que no pertenecen a ningún bloque.
+def _en_periodos(valores, periodos):
+    if periodos is None:
+        return valores
+    return [valores[i] for i, _ in periodos if i < len(valores)]
+
+
+def _es_numero(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def _cerrar_bloque(bloque):
+    cargados = {fecha for _, _, fecha, valor in bloque if _es_numero(valor) and valor != 0}
+    return [registro for registro in bloque if registro[2] in cargados]
+
+
+# Valores crudos de las columnas del esquema presentes en el libro.
+def leer_columnas(ruta, esquema):
+    if esquema.get('formato') == 'bloques':
+        return _columnas_bloques(ruta, esquema)
+    return _columnas_libro(ruta, esquema)
+
+
+def tipar(columnas, esquema):
+    return pd.DataFrame({
+        nombre: _convertir(valores, esquema['columnas'][nombre])
+        for nombre, valores in columnas.items()
+    })
+
+
+def leer_libro(ruta, esquema):
+    return tipar(leer_columnas(ruta, esquema), esquema)
+
+
+# El porcentaje de banda llega a veces como 0-100 y a veces como 0-1.
+def normalizar_banda(serie):
+    return serie.where(serie <= 1, serie / 100)
+
+
+# Carga una fuente por nombre, sin validarla.
+def cargar_fuente(nombre, directorio='.'):
+    esquema = ESQUEMAS[nombre]
+    return leer_libro(os.path.join(directorio, esquema['archivo']), esquema)
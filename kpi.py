@@ -0,0 +1,68 @@
+# Rollups del tablero de KPIs (kpi.xlsx).
+# La ingesta deja la hoja en formato largo (indicador, area, periodo, valor);
+# acá se calculan una sola vez por versión del libro las series por período,
+# el resumen por área, las tablas área x período y el último valor de cada
+# indicador, y la página sólo elige qué mostrar.
+import numpy as np
+import pandas as pd
+
+# Fila con el total del clúster en los bloques que la traen
+AREA_TOTAL = 'Clúster'
+
+
+def etiqueta_periodo(periodo):
+    return periodo.strftime('%Y-%m')
+
+
+def rollups(df):
+    df = df.dropna(subset=['indicador', 'area', 'periodo']).sort_values('periodo', kind='stable')
+    indicadores = list(pd.unique(df['indicador']))
+    claves = ['indicador', 'periodo']
+
+    # Total por indicador y período: la fila del clúster cuando existe y, si no,
+    # el promedio de las áreas (son tasas o promedios que no se suman)
+    es_total = (df['area'] == AREA_TOTAL).to_numpy()
+    areas = df[~es_total]
+    total = df[es_total].set_index(claves)['valor']
+    promedio = areas.groupby(claves, sort=False)['valor'].mean()
+    por_periodo = total.combine_first(promedio).rename('Total').reset_index()
+    por_periodo['indicador'] = pd.Categorical(por_periodo['indicador'], categories=indicadores)
+    por_periodo = por_periodo.sort_values(claves, ignore_index=True)
+    por_periodo['Anterior'] = por_periodo.groupby('indicador', observed=True)['Total'].shift()
+    por_periodo['Variacion'] = por_periodo['Total'] - por_periodo['Anterior']
+    por_periodo['Periodo'] = por_periodo['periodo'].map(etiqueta_periodo)
+    por_periodo['indicador'] = por_periodo['indicador'].astype(str)
+
+    ultimo = por_periodo.groupby('indicador', sort=False).tail(1).set_index('indicador').reindex(indicadores)
+
+    por_area = areas.groupby(['indicador', 'area'], sort=False)['valor'].agg(
+        Ultimo='last', Promedio='mean', Minimo='min', Maximo='max', Periodos='count'
+    ).reset_index()
+
+    tablas = {}
+    series = {}
+    for indicador, grupo in df.groupby('indicador', sort=False):
+        tabla = grupo.pivot_table(index='area', columns='periodo', values='valor', aggfunc='last', sort=False)
+        tabla.columns = [etiqueta_periodo(p) for p in tabla.columns]
+        tablas[indicador] = tabla
+        serie = grupo[grupo['area'] != AREA_TOTAL][['area', 'periodo', 'valor']].copy()
+        serie['Periodo'] = serie['periodo'].map(etiqueta_periodo)
+        series[indicador] = serie.reset_index(drop=True)
+
+    # Indicadores expresados como fracción (rotación, retención, tasas de uso)
+    valores = df.groupby('indicador', sort=False)['valor']
+    tasas = {
+        indicador for indicador, serie in valores
+        if serie.between(0, 1).all() and not np.allclose(serie, serie.round())
+    }
+
+    return {
+        'indicadores': indicadores,
+        'periodos': sorted(df['periodo'].unique()),
+        'por_periodo': por_periodo,
+        'ultimo': ultimo,
+        'por_area': por_area,
+        'tablas': tablas,
+        'series': series,
+        'tasas': tasas,
+    }
@@ -0,0 +1,83 @@
+# Importes en centavos.
+# Las columnas de tipo MONEDA se guardan al ingerir como enteros de centavos
+# (Int64), así las sumas son exactas y no dependen del orden de las filas.
+# Las agregaciones de este módulo trabajan sobre esos enteros y devuelven
+# pesos; para mostrar o exportar una tabla se usa en_pesos().
+import numpy as np
+import pandas as pd
+
+import ingesta
+
+CENTAVOS = 100
+
+
+def es_moneda(columna):
+    return columna in ingesta.COLUMNAS_MONEDA
+
+
+# Centavos (Int64) a un array float64 de pesos, con NaN en los faltantes.
+def pesos(centavos):
+    return pd.array(centavos, dtype='Int64').to_numpy(dtype='float64', na_value=np.nan) / CENTAVOS
+
+
+# Copia de `df` con las columnas de moneda en pesos.
+def en_pesos(df):
+    columnas = [col for col in df.columns if es_moneda(col)]
+    if not columnas:
+        return df
+    df = df.copy()
+    for col in columnas:
+        df[col] = pesos(df[col])
+    return df
+
+
+def _enteros(serie):
+    return serie.dropna().to_numpy(dtype=np.int64)
+
+
+def suma(serie):
+    return int(_enteros(serie).sum()) / CENTAVOS
+
+
+# Suma, promedio, mínimo y máximo en pesos ignorando los faltantes.
+def resumen(serie):
+    valores = _enteros(serie)
+    if len(valores) == 0:
+        return {'suma': 0.0, 'promedio': 0.0, 'minimo': 0.0, 'maximo': 0.0, 'cantidad': 0}
+    total = int(valores.sum())
+    return {
+        'suma': total / CENTAVOS,
+        'promedio': total / len(valores) / CENTAVOS,
+        'minimo': int(valores.min()) / CENTAVOS,
+        'maximo': int(valores.max()) / CENTAVOS,
+        'cantidad': len(valores),
+    }
+
+
+# Suma, promedio, mínimo, máximo y cantidad por grupo, en pesos. Ordena una
+# vez por grupo y reduce cada tramo con las operaciones enteras de NumPy. Las
+# filas sin grupo o sin importe no cuentan.
+def por_grupo(df, grupo, columna):
+    codigos, valores_grupo = pd.factorize(df[grupo], sort=True)
+    centavos = df[columna]
+    validas = (codigos >= 0) & centavos.notna().to_numpy()
+    codigos = codigos[validas]
+    valores = centavos.to_numpy(dtype=np.int64, na_value=0)[validas]
+    columnas = [grupo, 'Suma', 'Promedio', 'Minimo', 'Maximo', 'Cantidad']
+    if len(valores) == 0:
+        return pd.DataFrame(columns=columnas)
+
+    orden = np.argsort(codigos, kind='stable')
+    codigos = codigos[orden]
+    valores = valores[orden]
+    inicios = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]])
+    cantidad = np.diff(np.r_[inicios, len(valores)])
+    sumas = np.add.reduceat(valores, inicios)
+    return pd.DataFrame({
+        grupo: valores_grupo[codigos[inicios]],
+        'Suma': sumas / CENTAVOS,
+        'Promedio': sumas / cantidad / CENTAVOS,
+        'Minimo': np.minimum.reduceat(valores, inicios) / CENTAVOS,
+        'Maximo': np.maximum.reduceat(valores, inicios) / CENTAVOS,
+        'Cantidad': cantidad,
+    }, columns=columnas)
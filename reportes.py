@@ -0,0 +1,157 @@
+# Generación de los reportes descargables.
+# Las funciones devuelven los bytes del archivo y reciben un callback
+# `progreso(fraccion, mensaje)` para poder correr en la cola de tareas. Los
+# DataFrames llegan con los importes en centavos y se exportan en pesos.
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import xlsxwriter
+from fpdf import FPDF
+
+import montos
+from analitica import estadisticas_por_grupo
+
+LOGO = "logo-clusterciar.png"
+
+
+def _sin_progreso(fraccion, mensaje=''):
+    pass
+
+
+def clean_text(text):
+    return ''.join(c for c in str(text) if ord(c) < 128)
+
+
+# `metricas` trae las mismas claves que la hoja Resumen.
+def resumen_sueldos_fc(df_filtered, metricas):
+    return pd.DataFrame({
+        'Total_personas': [len(df_filtered)],
+        'Sueldo_Promedio': [metricas['promedio_sueldo']],
+        'Sueldo_Mínimo': [metricas['minimo_sueldo']],
+        'Sueldo_Máximo': [metricas['maximo_sueldo']],
+        'Dispersión_Salarial': [metricas['dispersion_sueldo']],
+        'Costo_laboral': [metricas['costo_total']],
+        'Porcentaje_<25%': [metricas['banda_25']],
+        'Porcentaje_<50%': [metricas['banda_50']],
+        'Porcentaje_<75%': [metricas['banda_75']],
+        'Porcentaje_≥75%': [metricas['banda_arriba_75']]
+    })
+
+
+def excel_sueldos_fc(df_filtered, metricas, progreso=_sin_progreso):
+    progreso(0.1, 'Escribiendo datos filtrados')
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        montos.en_pesos(df_filtered).to_excel(writer, index=False, sheet_name='Datos Filtrados')
+        progreso(0.8, 'Escribiendo resumen')
+        resumen_sueldos_fc(df_filtered, metricas).to_excel(writer, index=False, sheet_name='Resumen')
+    return output.getvalue()
+
+
+def pdf_sueldos_fc(df_filtered, metricas, progreso=_sin_progreso):
+    progreso(0.1, 'Armando encabezado')
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    try:
+        pdf.image(LOGO, x=10, y=8, w=50)
+    except Exception:
+        pdf.cell(200, 10, txt="Logo no disponible", ln=True, align='C')
+
+    pdf.ln(30)
+    pdf.cell(200, 10, txt=clean_text("Reporte de Sueldos - Sueldos para Informes"), ln=True, align='C')
+    pdf.ln(10)
+    pdf.cell(200, 10, txt=clean_text(f"Total personas: {len(df_filtered)}"), ln=True)
+    pdf.cell(200, 10, txt=clean_text(f"Sueldo promedio: ${metricas['promedio_sueldo']:,.0f}"), ln=True)
+    pdf.cell(200, 10, txt=clean_text(f"Sueldo mínimo / máximo: ${metricas['minimo_sueldo']:,.0f} / ${metricas['maximo_sueldo']:,.0f}"), ln=True)
+    pdf.cell(200, 10, txt=clean_text(f"Dispersión salarial: ${metricas['dispersion_sueldo']:,.0f} ({metricas['dispersion_porcentaje']:.1f}%)"), ln=True)
+    pdf.cell(200, 10, txt=clean_text(f"Costo laboral total: ${metricas['costo_total']:,.0f}"), ln=True)
+    pdf.cell(200, 10, txt=clean_text(f"Porcentaje <25%: {metricas['banda_25']:.1f}%"), ln=True)
+    pdf.cell(200, 10, txt=clean_text(f"Porcentaje <50%: {metricas['banda_50']:.1f}%"), ln=True)
+    pdf.cell(200, 10, txt=clean_text(f"Porcentaje <75%: {metricas['banda_75']:.1f}%"), ln=True)
+    pdf.cell(200, 10, txt=clean_text(f"Porcentaje ≥75%: {metricas['banda_arriba_75']:.1f}%"), ln=True)
+
+    columns = ['Personaapellido', 'Personanombre', 'Puesto', 'Seniority', 'Porcentaje_Banda_Salarial', 'Total_sueldo_bruto']
+    if len(df_filtered) < 20 and all(col in df_filtered.columns for col in columns):
+        progreso(0.5, 'Agregando detalle de personas')
+        pdf.ln(20)
+        pdf.set_font("Arial", size=10)
+        pdf.cell(200, 10, txt="Detalles de Personas (ordenado por Total Sueldo Bruto descendente)", ln=True, align='C')
+        pdf.ln(5)
+
+        df_table = montos.en_pesos(df_filtered[columns]).sort_values(by='Total_sueldo_bruto', ascending=False)
+        pdf.set_font("Arial", size=8)
+
+        for col in columns:
+            pdf.cell(33, 10, clean_text(col.replace('_', ' ').title()), border=1, align='C')
+        pdf.ln()
+
+        for index, row in df_table.iterrows():
+            pdf.cell(33, 10, clean_text(str(row['Personaapellido'])), border=1)
+            pdf.cell(33, 10, clean_text(str(row['Personanombre'])), border=1)
+            pdf.cell(33, 10, clean_text(str(row['Puesto'])), border=1)
+            pdf.cell(33, 10, clean_text(str(row['Seniority'])), border=1)
+            pdf.cell(33, 10, clean_text(f"{row['Porcentaje_Banda_Salarial']*100:.1f}%"), border=1)
+            pdf.cell(35, 10, clean_text(f"${row['Total_sueldo_bruto']:,.0f}"), border=1)
+            pdf.ln()
+
+    progreso(0.9, 'Generando archivo')
+    return pdf.output(dest='S').encode('latin-1')
+
+
+# Totales de "Sueldos Todos" por empresa más una fila con el total general.
+def totales_sueldos_todos(df):
+    columnas = ['total_sueldo_bruto', 'neto', 'total_costo_laboral']
+    por_empresa = pd.DataFrame({'cantidad_personas': df.groupby('empresa').size()})
+    fila_total = [len(df)]
+    for col in columnas:
+        agregado = montos.por_grupo(df, 'empresa', col).set_index('empresa')
+        por_empresa[f'{col}_sum'] = agregado['Suma']
+        por_empresa[f'{col}_mean'] = agregado['Promedio']
+        resumen = montos.resumen(df[col])
+        fila_total += [resumen['suma'], resumen['promedio']]
+    total = pd.DataFrame([fila_total], columns=por_empresa.columns, index=pd.Index(['Total'], name='empresa'))
+    return pd.concat([por_empresa, total]).reset_index()
+
+
+# Escribe las hojas fila por fila con xlsxwriter en modo de memoria constante.
+def escribir_libro(hojas, progreso=_sin_progreso):
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'default_date_format': 'dd/mm/yyyy'})
+    encabezado = workbook.add_format({'bold': True})
+    for numero, (nombre, df) in enumerate(hojas):
+        progreso(0.5 + 0.5 * numero / len(hojas), f'Escribiendo hoja {nombre}')
+        worksheet = workbook.add_worksheet(nombre[:31])
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], encabezado)
+        valores = df.astype(object).where(df.notna(), None)
+        for fila, registro in enumerate(valores.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(fila, 0, registro)
+    workbook.close()
+    return output.getvalue()
+
+
+# Paquete consolidado: datos filtrados de Sueldos FC con su resumen, una hoja
+# por agrupador, totales de Sueldos Todos y la Tabla Salarial completa. Las
+# hojas se calculan en paralelo y luego se escriben en orden.
+def paquete_consolidado(df_filtered, metricas, agrupadores, df_todos, df_tabla, progreso=_sin_progreso):
+    tareas = [
+        ('Sueldos FC', lambda: montos.en_pesos(df_filtered)),
+        ('Resumen', lambda: resumen_sueldos_fc(df_filtered, metricas)),
+    ]
+    if 'Total_sueldo_bruto' in df_filtered.columns:
+        tareas += [(f'Por {grupo}', lambda grupo=grupo: estadisticas_por_grupo(df_filtered, grupo)) for grupo in agrupadores]
+    if df_todos is not None:
+        tareas.append(('Sueldos Todos', lambda: totales_sueldos_todos(df_todos)))
+    if df_tabla is not None:
+        tareas.append(('Tabla Salarial', lambda: df_tabla))
+
+    progreso(0.05, 'Calculando hojas')
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futuros = [(nombre, executor.submit(calcular)) for nombre, calcular in tareas]
+        hojas = []
+        for numero, (nombre, futuro) in enumerate(futuros, start=1):
+            hojas.append((nombre, futuro.result()))
+            progreso(0.5 * numero / len(futuros), f'Hoja {nombre} lista')
+    return escribir_libro(hojas, progreso)
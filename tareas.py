@@ -0,0 +1,102 @@
+# Cola de tareas en segundo plano para exportaciones y reportes.
+# Las tareas corren en un pool de hilos del proceso, así que sobreviven a los
+# reruns de Streamlit. Cada tarea se identifica por una clave derivada de su
+# tipo y parámetros: si otra sesión pide lo mismo mientras está en curso se
+# reutiliza la misma tarea, y los archivos terminados quedan en un caché con
+# tamaño máximo para volver a descargarlos.
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PENDIENTE = 'pendiente'
+EN_CURSO = 'en_curso'
+TERMINADA = 'terminada'
+ERROR = 'error'
+
+
+def clave_tarea(tipo, *partes):
+    firma = json.dumps([tipo, *partes], sort_keys=True, default=str, ensure_ascii=False)
+    return f"{tipo}-{hashlib.sha1(firma.encode('utf-8')).hexdigest()[:16]}"
+
+
+class Tarea:
+    def __init__(self, clave, descripcion):
+        self.clave = clave
+        self.descripcion = descripcion
+        self.estado = PENDIENTE
+        self.progreso = 0.0
+        self.mensaje = ''
+        self.error = None
+        self.creada = time.time()
+
+    # Se pasa a la función de la tarea para que informe su avance (0 a 1).
+    def reportar(self, progreso, mensaje=''):
+        self.progreso = min(max(float(progreso), 0.0), 1.0)
+        self.mensaje = mensaje
+
+
+class ColaTareas:
+    def __init__(self, trabajadores=2, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix='tarea')
+        self._lock = threading.Lock()
+        self._tareas = {}
+        self._artefactos = OrderedDict()
+        self._bytes = 0
+
+    # Encola `funcion(*args, progreso=callback, **kwargs)` salvo que ya exista
+    # una tarea viva o un resultado guardado con la misma clave.
+    def enviar(self, clave, funcion, *args, descripcion='', **kwargs):
+        with self._lock:
+            if clave in self._artefactos:
+                self._artefactos.move_to_end(clave)
+                return clave
+            tarea = self._tareas.get(clave)
+            if tarea is not None and tarea.estado in (PENDIENTE, EN_CURSO):
+                return clave
+            tarea = Tarea(clave, descripcion)
+            self._tareas[clave] = tarea
+        self._executor.submit(self._ejecutar, tarea, funcion, args, kwargs)
+        return clave
+
+    def _ejecutar(self, tarea, funcion, args, kwargs):
+        tarea.estado = EN_CURSO
+        try:
+            resultado = funcion(*args, progreso=tarea.reportar, **kwargs)
+        except Exception as e:
+            tarea.error = str(e)
+            tarea.estado = ERROR
+            return
+        self._guardar(tarea.clave, resultado)
+        tarea.reportar(1.0, 'Listo')
+        tarea.estado = TERMINADA
+
+    # Guarda el resultado y descarta los menos usados hasta volver al límite.
+    def _guardar(self, clave, contenido):
+        with self._lock:
+            self._artefactos[clave] = contenido
+            self._bytes += len(contenido)
+            while self._bytes > self.max_bytes and len(self._artefactos) > 1:
+                vieja, datos = self._artefactos.popitem(last=False)
+                self._bytes -= len(datos)
+                self._tareas.pop(vieja, None)
+
+    def estado(self, clave):
+        with self._lock:
+            if clave in self._artefactos and clave not in self._tareas:
+                return TERMINADA
+            tarea = self._tareas.get(clave)
+        return tarea.estado if tarea is not None else None
+
+    def tarea(self, clave):
+        return self._tareas.get(clave)
+
+    def resultado(self, clave):
+        with self._lock:
+            contenido = self._artefactos.get(clave)
+            if contenido is not None:
+                self._artefactos.move_to_end(clave)
+            return contenido